@@ -0,0 +1,220 @@
+"""Benchmark of TronTransferExporter._group_transfers.
+
+Measures how grouping scales with the count of transfers and the count of group filters and compares it with
+the previous implementation, which scanned all filters for every transfer. Both must return the same groups,
+and the external merge of large exports must return the rows of the in-memory merge.
+
+Usage: python -m benchmarks.bench_group_transfers
+"""
+import contextlib
+import io
+import random
+import time
+
+import walletscan
+
+
+def legacy_group_transfers(group_filters, transfers):
+    """Previous implementation of TronTransferExporter._group_transfers.
+
+    The previous implementation started an empty first group and a new group for every transfer to a filtered
+    destination. This copy joins consecutive transfers to the same destination like the current one, so the
+    results can be compared.
+    """
+    if not group_filters:
+        return {}, transfers
+
+    sorted_tr = sorted(transfers, key=lambda x: x.timestamp)
+
+    grouped_tr = {}
+    ungrouped_tr = []
+    new_group_currenys = []
+    for t in sorted_tr:
+        for g_filter in group_filters:
+            is_grouped = False
+
+            # deposit
+            if g_filter['from_address'] is not None and g_filter['from_address'] == t.from_address:
+                # Add token as a new category, if the category doesn't exist yet
+                if t.token_name not in grouped_tr:
+                    grouped_tr[t.token_name] = {'count': 0, 'groups': []}
+
+                # Add new Group, if the token has nos group yet
+                if grouped_tr[t.token_name]['count'] == 0:
+                    grouped_tr[t.token_name]['groups'].append({'is_outgoing': False,
+                                                               'address': t.from_address,
+                                                               'transfers': []})
+                    grouped_tr[t.token_name]['count'] = 1
+
+                # Current group index
+                group_index = grouped_tr[t.token_name]['count'] - 1
+
+                # If the current transfer does not fit into the group, new group will be created
+                if grouped_tr[t.token_name]['groups'][group_index]['is_outgoing'] or \
+                   grouped_tr[t.token_name]['groups'][group_index]['address'] != t.from_address or \
+                   t.token_name in new_group_currenys:
+
+                    # Add new group
+                    grouped_tr[t.token_name]['groups'].append({'is_outgoing': False,
+                                                               'address': t.from_address,
+                                                               'transfers': []})
+
+                    grouped_tr[t.token_name]['count'] += 1
+                    group_index = grouped_tr[t.token_name]['count'] - 1
+                    if t.token_name in new_group_currenys:
+                        new_group_currenys.remove(t.token_name)
+
+                # Add transfer to group
+                grouped_tr[t.token_name]['groups'][group_index]['transfers'].append(
+                    t)
+                is_grouped = True
+                break
+
+            # withdrawal
+            elif g_filter['to_address'] is not None and g_filter['to_address'] == t.to_address:
+                 # Add token as a new category, if the category doesn't exist yet
+                if t.token_name not in grouped_tr:
+                    grouped_tr[t.token_name] = {'count': 0, 'groups': []}
+
+                # Add new Group, if the token has nos group yet
+                if grouped_tr[t.token_name]['count'] == 0:
+                    grouped_tr[t.token_name]['groups'].append({'is_outgoing': True,
+                                                               'address': t.to_address,
+                                                               'transfers': []})
+                    grouped_tr[t.token_name]['count'] = 1
+
+                # Current group index
+                group_index = grouped_tr[t.token_name]['count'] - 1
+
+                # If the current transfer does not fit into the group, new group will be created
+                if not grouped_tr[t.token_name]['groups'][group_index]['is_outgoing'] or \
+                   grouped_tr[t.token_name]['groups'][group_index]['address'] != t.to_address or \
+                   t.token_name in new_group_currenys:
+
+                    # Add new group
+                    grouped_tr[t.token_name]['groups'].append({'is_outgoing': True,
+                                                               'address': t.to_address,
+                                                               'transfers': []})
+
+                    grouped_tr[t.token_name]['count'] += 1
+                    group_index = grouped_tr[t.token_name]['count'] - 1
+                    if t.token_name in new_group_currenys:
+                        new_group_currenys.remove(t.token_name)
+
+                # Add transfer to group
+                grouped_tr[t.token_name]['groups'][group_index]['transfers'].append(
+                    t)
+                is_grouped = True
+                break
+
+        if not is_grouped:
+            if t.token_name in grouped_tr and t.token_name not in new_group_currenys:
+                new_group_currenys.append(t.token_name)
+
+            # Add transfer to the not grouped
+            ungrouped_tr.append(t)
+
+    groups = []
+    for _, value in grouped_tr.items():
+        for g_filter in value['groups']:
+            groups.append(g_filter['transfers'])
+
+    return groups, ungrouped_tr
+
+
+def make_transfers(count: int, address_count: int, wallet: str = 'WALLET', seed: int = 1):
+    """Creates random transfers between a wallet and address_count counterparties."""
+    rnd = random.Random(seed)
+    tokens = ['_', 'TOKEN_A', 'TOKEN_B', 'TOKEN_C']
+    transfers = []
+
+    for i in range(0, count):
+        t = walletscan.TronTransfer()
+        t.id = str(i)
+        t.timestamp = 1546300800000 + rnd.randrange(0, count) * 1000
+        counterparty = 'ADDR' + str(rnd.randrange(0, address_count))
+        if rnd.random() < 0.5:
+            t.from_address, t.to_address = counterparty, wallet
+        else:
+            t.from_address, t.to_address = wallet, counterparty
+        t.amount = rnd.randrange(1, 10**6)
+        t.token_name = rnd.choice(tokens)
+        t.confirmed = True
+        transfers.append(t)
+
+    return transfers
+
+
+def make_exporter(filter_count: int, address_count: int, seed: int = 2, destinations=True):
+    """Creates an exporter with filter_count group filters on random senders and destinations."""
+    rnd = random.Random(seed)
+    exporter = walletscan.TronTransferExporter('WALLET', token_cache=walletscan.TokenInfoCache(fetch=lambda t: None))
+
+    for _ in range(0, filter_count):
+        address = 'ADDR' + str(rnd.randrange(0, address_count))
+        if not destinations or rnd.random() < 0.5:
+            exporter.add_group_filter('_', from_address=address)
+        else:
+            exporter.add_group_filter('_', to_address=address)
+
+    return exporter
+
+
+def same_groups(a, b):
+    """Compares two grouping results by transfer identity."""
+    return [[id(t) for t in g] for g in a[0]] == [[id(t) for t in g] for g in b[0]] and \
+        [id(t) for t in a[1]] == [id(t) for t in b[1]]
+
+
+def merged_rows(transfers):
+    """Fields of merged transfers for comparing the in-memory and the external merge."""
+    return [(t.timestamp, t.id, t.from_address, t.to_address, t.amount, t.token_name, bool(t.confirmed), t.comment)
+            for t in transfers]
+
+
+def check_external_merge(transfers, address_count: int):
+    """Checks that the external merge returns the rows of the in-memory merge for sender and destination filters."""
+    for destinations in (False, True):
+        exporter = make_exporter(10, address_count, destinations=destinations)
+        with contextlib.redirect_stdout(io.StringIO()):
+            external = merged_rows(exporter._merge_transfers_external(transfers, max(1, len(transfers) // 7)))
+        if merged_rows(exporter._merge_transfers(list(transfers))) != external:
+            raise AssertionError('External merge differs for %d transfers, destination filters: %s' %
+                                 (len(transfers), destinations))
+
+
+def bench(function, repeat: int = 3):
+    best = None
+    result = None
+    for _ in range(0, repeat):
+        start = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    address_count = 500
+    print('%10s %8s %12s %12s %8s' % ('transfers', 'filters', 'legacy [s]', 'indexed [s]', 'speedup'))
+
+    for count in (1000, 10000, 100000):
+        transfers = make_transfers(count, address_count)
+        if count <= 10000:
+            check_external_merge(transfers, address_count)
+
+        for filter_count in (1, 10, 100):
+            exporter = make_exporter(filter_count, address_count)
+
+            legacy_time, legacy = bench(lambda: legacy_group_transfers(exporter.group_filters, transfers))
+            indexed_time, indexed = bench(lambda: exporter._group_transfers(transfers))
+
+            if not same_groups(legacy, indexed):
+                raise AssertionError('Grouping differs for %d transfers and %d filters' % (count, filter_count))
+
+            print('%10d %8d %12.4f %12.4f %7.1fx' % (count, filter_count, legacy_time, indexed_time,
+                                                     legacy_time / indexed_time))
+
+
+if __name__ == '__main__':
+    main()
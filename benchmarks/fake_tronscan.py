@@ -0,0 +1,271 @@
+"""Local stand-in for the tronscan api.
+
+Serves the transfer, transaction and token endpoints for synthetic wallets of any size with configurable
+latency, error rate and page cap, so scans can be measured offline.
+
+Usage:
+    with FakeTronScanServer(latency=0.05) as server:
+        server.add_wallet('TWALLET', transfer_count=100000)
+        TronScan.API_URL_BASE = server.api_url
+"""
+import bisect
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlparse
+
+
+class SyntheticWallet(object):
+    """Deterministic transfers and transactions of a wallet, newest first like the api."""
+
+    # Timestamp of the first generated entry
+    FIRST_TIMESTAMP = 1546300800000
+
+    TOKENS = ['_', '1002000', 'TOKEN_A', 'TOKEN_B', 'SPAM']
+
+    def __init__(self, address: str, transfer_count: int, transaction_count: int = None, counterparties: int = 50,
+                 interval: int = 60000, seed: int = 1):
+        self.address = address
+        self.transfer_count = transfer_count
+        self.transaction_count = transfer_count if transaction_count is None else transaction_count
+        self.counterparties = counterparties
+        self.interval = interval
+        self.seed = seed
+        self._transfers = None
+        self._transactions = None
+        self._token_index = {}
+        self._lock = threading.Lock()
+
+    def _timestamps(self, rnd, count):
+        """Ascending timestamps with several entries per timestamp now and then."""
+        timestamps = []
+        ts = self.FIRST_TIMESTAMP
+        for _ in range(0, count):
+            if rnd.random() > 0.1:
+                ts += rnd.randrange(1, self.interval)
+            timestamps.append(ts)
+        return timestamps
+
+    def transfers(self):
+        with self._lock:
+            if self._transfers is None:
+                rnd = random.Random(self.seed)
+                entries = []
+                for i, ts in enumerate(self._timestamps(rnd, self.transfer_count)):
+                    counterparty = 'TADDR' + str(rnd.randrange(0, self.counterparties))
+                    incoming = rnd.random() < 0.6
+                    entries.append({
+                        'id': self.address + '-t' + str(i),
+                        'block': 5000000 + i,
+                        'transactionHash': '%064x' % rnd.getrandbits(256),
+                        'timestamp': ts,
+                        'transferFromAddress': counterparty if incoming else self.address,
+                        'transferToAddress': self.address if incoming else counterparty,
+                        'amount': rnd.randrange(1, 10**9),
+                        'tokenName': rnd.choice(self.TOKENS),
+                        'confirmed': True,
+                        'data': ''})
+                entries.reverse()
+                self._transfers = (entries, [-e['timestamp'] for e in entries])
+            return self._transfers
+
+    def transfers_of_token(self, token: str):
+        entries, _ = self.transfers()
+        with self._lock:
+            if token not in self._token_index:
+                token_entries = [e for e in entries if e['tokenName'] == token]
+                self._token_index[token] = (token_entries, [-e['timestamp'] for e in token_entries])
+            return self._token_index[token]
+
+    def transactions(self):
+        with self._lock:
+            if self._transactions is None:
+                rnd = random.Random(self.seed + 1)
+                entries = []
+                for i, ts in enumerate(self._timestamps(rnd, self.transaction_count)):
+                    counterparty = 'TADDR' + str(rnd.randrange(0, self.counterparties))
+                    contract_type = rnd.choice([1, 1, 1, 2, 4, 11, 31])
+                    if contract_type == 1:
+                        contract = {'owner_address': self.address, 'to_address': counterparty,
+                                    'amount': rnd.randrange(1, 10**9)}
+                    elif contract_type == 2:
+                        contract = {'owner_address': self.address, 'to_address': counterparty,
+                                    'asset_name': rnd.choice(self.TOKENS[1:]), 'amount': rnd.randrange(1, 10**9)}
+                    elif contract_type == 4:
+                        contract = {'owner_address': self.address,
+                                    'votes': [{'vote_address': counterparty, 'vote_count': rnd.randrange(1, 100)}]}
+                    elif contract_type == 11:
+                        contract = {'owner_address': self.address, 'frozen_duration': 3,
+                                    'frozen_balance': rnd.randrange(1, 10**9)}
+                    else:
+                        contract = {'owner_address': self.address, 'contract_address': counterparty,
+                                    'data': '%064x' % rnd.getrandbits(256)}
+                    entries.append({
+                        'block': 5000000 + i,
+                        'hash': '%064x' % rnd.getrandbits(256),
+                        'timestamp': ts,
+                        'ownerAddress': self.address,
+                        'toAddress': counterparty,
+                        'contractType': contract_type,
+                        'contractData': contract,
+                        'SmartCalls': '',
+                        'Events': '',
+                        'id': '',
+                        'confirmed': True,
+                        'data': '',
+                        'fee': rnd.randrange(0, 10**6)})
+                entries.reverse()
+                self._transactions = (entries, [-e['timestamp'] for e in entries])
+            return self._transactions
+
+
+class FakeTronScanServer(object):
+    """Local http server with the transfer, transaction and token endpoints of the tronscan api."""
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0, page_cap: int = None,
+                 token_precision: int = 6, seed: int = 1):
+        """
+        Keyword Arguments:
+            latency {float} -- Delay of every response in seconds. (default: {0.0})
+            jitter {float} -- Random additional delay of up to jitter seconds. (default: {0.0})
+            error_rate {float} -- Fraction of requests which fail with status 503. (default: {0.0})
+            page_cap {int} -- Maximum start + limit of a query like the api limit. None for no cap. (default: {None})
+            token_precision {int} -- Precision of all tokens. (default: {6})
+            seed {int} -- Seed of the error and latency generator. (default: {1})
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.page_cap = page_cap
+        self.token_precision = token_precision
+        self.wallets = {}
+        self.request_count = 0
+        self.error_count = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    def add_wallet(self, address: str, transfer_count: int, transaction_count: int = None, **kwargs):
+        """Adds a synthetic wallet.
+
+        Arguments:
+            address {str} -- Address of wallet.
+            transfer_count {int} -- Count of transfers.
+
+        Keyword Arguments:
+            transaction_count {int} -- Count of transactions. None for transfer_count. (default: {None})
+
+        Returns:
+            SyntheticWallet -- Wallet.
+        """
+        wallet = SyntheticWallet(address, transfer_count, transaction_count, seed=len(self.wallets) + 1, **kwargs)
+        self.wallets[address] = wallet
+        return wallet
+
+    @property
+    def api_url(self):
+        """Base url of the api, to be used as TronScan.API_URL_BASE."""
+        return 'http://127.0.0.1:%d/api/' % self._server.server_port
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def start(self):
+        """Starts the server in a background thread."""
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                status, body = fake.handle(self.path)
+                payload = json.dumps(body).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stops the server."""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def handle(self, path: str):
+        """Answers a request.
+
+        Arguments:
+            path {str} -- Path and query of the request.
+
+        Returns:
+            (int, dict) -- Status and json body.
+        """
+        with self._lock:
+            self.request_count += 1
+            delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0)
+            failed = self.error_rate and self._random.random() < self.error_rate
+            if failed:
+                self.error_count += 1
+
+        if delay:
+            time.sleep(delay)
+        if failed:
+            return 503, {'message': 'service unavailable'}
+
+        url = urlparse(path)
+        query = dict(parse_qsl(url.query))
+        endpoint = url.path.rstrip('/').rsplit('/', 1)[-1]
+
+        if endpoint == 'token':
+            return 200, {'total': 1, 'data': [{'id': query.get('id'), 'name': query.get('id'),
+                                                'precision': self.token_precision}]}
+
+        if endpoint not in ('transfer', 'transaction'):
+            return 404, {'message': 'unknown endpoint'}
+
+        wallet = self.wallets.get(query.get('address'))
+        if wallet is None:
+            return 200, {'total': 0, 'data': []}
+
+        if endpoint == 'transfer':
+            if 'token' in query:
+                entries, keys = wallet.transfers_of_token(query['token'])
+            else:
+                entries, keys = wallet.transfers()
+        else:
+            entries, keys = wallet.transactions()
+
+        # Entries are sorted newest first, the keys are the negated timestamps
+        begin = 0
+        end = len(entries)
+        if 'end_timestamp' in query:
+            begin = bisect.bisect_left(keys, -int(query['end_timestamp']))
+        if 'start_timestamp' in query:
+            end = bisect.bisect_right(keys, -int(query['start_timestamp']))
+        end = max(begin, end)
+
+        start = int(query.get('start', 0))
+        limit = int(query.get('limit', 20))
+        if self.page_cap is not None and start + limit > self.page_cap:
+            return 400, {'message': 'start + limit exceeds ' + str(self.page_cap)}
+
+        return 200, {'total': end - begin, 'rangeTotal': end - begin,
+                     'data': entries[begin + start:min(end, begin + start + limit)]}
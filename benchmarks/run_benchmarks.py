@@ -0,0 +1,157 @@
+"""End-to-end benchmarks of scanner, parser and exporter against the local tronscan stand-in.
+
+Measures fetch throughput of the scan modes, parse rate and export rows per second, and records the peak
+memory of every benchmark. Results are printed as a table and can be written as json to compare runs.
+
+Usage: python -m benchmarks.run_benchmarks [--transfers 20000] [--latency 0.02] [--workers 8] [--json FILE]
+       [--no-trace-memory]
+"""
+import argparse
+import json
+import os
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import walletscan
+from benchmarks.fake_tronscan import FakeTronScanServer
+
+WALLET = 'TBENCHWALLET'
+
+# Tracing of python allocations slows down the benchmarks, it can be switched off for exact timings
+TRACE_MEMORY = True
+
+
+def measure(name: str, count_unit: str, function):
+    """Runs a benchmark and measures its time and peak memory of python allocations."""
+    if TRACE_MEMORY:
+        tracemalloc.start()
+    start = time.perf_counter()
+    count = function()
+    elapsed = time.perf_counter() - start
+    peak = 0
+    if TRACE_MEMORY:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    result = {'name': name, 'count': count, 'unit': count_unit, 'seconds': elapsed,
+              'rate': count / elapsed if elapsed else 0.0, 'peak_mib': peak / 2**20}
+    print('%-36s %10d %-10s %9.3f s %12.1f /s %9.1f MiB' % (name, count, count_unit, elapsed, result['rate'],
+                                                           result['peak_mib']))
+    sys.stdout.flush()
+    return result
+
+
+def quiet(function):
+    """Suppresses the status output of the library during a benchmark."""
+    def wrapper():
+        stdout = sys.stdout
+        sys.stdout = open(os.devnull, 'w')
+        try:
+            return function()
+        finally:
+            sys.stdout.close()
+            sys.stdout = stdout
+    return wrapper
+
+
+def run(args):
+    results = []
+
+    with FakeTronScanServer(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate) as server:
+        server.add_wallet(WALLET, args.transfers, args.transactions)
+
+        walletscan.TronScan.API_URL_BASE = server.api_url
+        walletscan.TronScan.TRANSPORT.rate_limiter = None
+        walletscan.TronScan.TRANSPORT.backoff = 0.01
+
+        scanner = walletscan.TronScan(WALLET)
+        print('%-36s %10s %-10s %11s %15s %13s' % ('benchmark', 'count', 'unit', 'time', 'rate', 'peak'))
+
+        # Fetching
+        results.append(measure('fetch transfers sequential', 'transfers', quiet(
+            lambda: scanner.get_transfers(verbose=False)['total'])))
+        results.append(measure('fetch transfers %d workers' % args.workers, 'transfers', quiet(
+            lambda: scanner.get_transfers(verbose=False, workers=args.workers)['total'])))
+        results.append(measure('stream transfers %d workers' % args.workers, 'transfers', quiet(
+            lambda: sum(1 for _ in scanner.iter_transfers(workers=args.workers)))))
+        results.append(measure('stream transfers %d workers %d parsers' % (args.workers, args.parse_workers),
+                               'transfers', quiet(lambda: sum(1 for _ in scanner.iter_transfers(
+                                   workers=args.workers, parse_workers=args.parse_workers)))))
+        results.append(measure('fetch transactions %d workers' % args.workers, 'transactions', quiet(
+            lambda: scanner.get_all_transactions(workers=args.workers)['total'])))
+
+        # Parsing
+        server.latency = 0
+        transfer_dict = quiet(lambda: scanner.get_transfers(verbose=False, workers=args.workers))()
+        transaction_dict = quiet(lambda: scanner.get_all_transactions(workers=args.workers))()
+
+        results.append(measure('parse transfers', 'transfers', lambda: len(
+            walletscan.TronTransfer.parse_transfers(transfer_dict))))
+        results.append(measure('parse transfers as batch', 'transfers', lambda: len(
+            walletscan.TronTransfer.parse_transfers(transfer_dict, as_batch=True))))
+        results.append(measure('parse transactions', 'transactions', lambda: len(
+            walletscan.TronTransaction.parse_transactions(transaction_dict))))
+
+        # Exporting
+        server.latency = args.latency
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'export.csv')
+
+            def export(group: bool):
+                exporter = walletscan.CoinTrackingExporter(WALLET, 'Bench')
+                exporter.add_assign(walletscan.TransferType.Mining, from_address='TADDR1')
+                if group:
+                    exporter.add_group_filter('_', from_address='TADDR2')
+                    exporter.add_group_filter('_', from_address='TADDR3')
+                exporter.export_csv(filename, workers=args.workers)
+                with open(filename, encoding='utf-8') as f:
+                    return sum(1 for _ in f) - 1
+
+            def write(export_format: str):
+                exporter = walletscan.CoinTrackingExporter(WALLET, 'Bench')
+                exporter.token_cache.prefetch(t for t in parsed.token_set() if t != '_')
+                with walletscan.ExportWriter(filename, export_format) as writer:
+                    return writer.write_all(exporter._iter_rows(list(parsed), 'Bench'))
+
+            parsed = walletscan.TronTransfer.parse_transfers(transfer_dict, as_batch=True)
+
+            results.append(measure('export_csv', 'rows', quiet(lambda: export(False))))
+            results.append(measure('export_csv grouped', 'rows', quiet(lambda: export(True))))
+            for export_format in sorted(walletscan.EXPORT_FORMATS):
+                results.append(measure('write %s without fetching' % export_format, 'rows', quiet(
+                    lambda: write(export_format))))
+
+        print('requests: %d, injected errors: %d, max rss: %.1f MiB' % (
+            server.request_count, server.error_count, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024))
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--transfers', type=int, default=20000, help='Count of transfers of the wallet.')
+    parser.add_argument('--transactions', type=int, default=None, help='Count of transactions of the wallet.')
+    parser.add_argument('--latency', type=float, default=0.02, help='Latency of the fake api in seconds.')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Random additional latency in seconds.')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of failing requests.')
+    parser.add_argument('--workers', type=int, default=8, help='Count of parallel requests.')
+    parser.add_argument('--parse-workers', type=int, default=2, help='Count of parsing processes.')
+    parser.add_argument('--no-trace-memory', action='store_true', help='Measures without memory tracing.')
+    parser.add_argument('--json', help='Writes the results to this json file.')
+    args = parser.parse_args()
+
+    global TRACE_MEMORY
+    TRACE_MEMORY = not args.no_trace_memory
+
+    results = run(args)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'arguments': vars(args), 'results': results}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,3 +1,40 @@
-from .tronparser import *
-from .tronscanner import *
-from .tronexporter import *
\ No newline at end of file
+import importlib
+
+# Public names of each module. A module is imported on the first access of one of its names, so quick
+# invocations do not import requests, pytz and the other heavy dependencies.
+_MODULES = {
+    'tronmetrics': ('Instrumentation', 'MetricsCollector', 'get_instrumentation', 'set_instrumentation'),
+    'trontransport': ('TronScanError', 'RateLimiter', 'TronTransport'),
+    'tronresponsecache': ('ResponseCache',),
+    'tronparser': ('decode_json', 'ContractType', 'DateFormatter', 'TronTransfer', 'TransferBatch',
+                   'TronTransaction', 'TronVote', 'TronContract'),
+    'tronscanner': ('TronScan',),
+    'tronasyncscanner': ('AsyncTronScan',),
+    'trontokencache': ('TokenInfoCache',),
+    'tronaggregate': ('PortfolioAggregator',),
+    'tronexternalsort': ('ExternalSorter',),
+    'tronstore': ('TronStore',),
+    'tronmultiscanner': ('WalletScanResult', 'MultiWalletScanner'),
+    'tronwriter': ('ExportRow', 'ExportFormat', 'CsvExportFormat', 'CoinTrackingCsvFormat', 'WideCsvFormat',
+                   'JsonLinesFormat', 'EXPORT_FORMATS', 'get_export_format', 'ExportWriter'),
+    'tronexporter': ('TransferType', 'TransferClassifier', 'TronTransferExporter', 'CoinTrackingExporter'),
+    'tronwatcher': ('WatchedWallet', 'TronWatcher'),
+}
+
+_NAMES = {name: module for module, names in _MODULES.items() for name in names}
+
+__all__ = list(_NAMES)
+
+
+def __getattr__(name):
+    module = _NAMES.get(name)
+    if module is None:
+        raise AttributeError("module " + repr(__name__) + " has no attribute " + repr(name))
+
+    value = getattr(importlib.import_module('.' + module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,324 @@
+"""Exports the transfers of the wallets of a config file.
+
+Example config:
+
+    {
+        "jobs": 4,
+        "workers": 4,
+        "store": "wallets.db",
+        "token_cache": "tokens.json",
+        "cache": {"directory": "cache", "mode": "read-through", "ttl": 3600},
+        "defaults": {"format": "cointracking", "start_date": "2020-01-01 00:00:00"},
+        "wallets": [
+            {
+                "address": "TWalletAddress",
+                "name": "Main",
+                "output": "main.csv",
+                "assignments": [{"type": "Mining", "from_address": "TPoolAddress"}],
+                "groups": [{"currency": "_", "from_address": "TPoolAddress"}],
+                "currencies": ["_", "TOKEN"],
+                "aliases": {"_": "TRX"}
+            }
+        ]
+    }
+
+Only "wallets" and the "address" and "output" of each wallet are required. "max_records" limits the transfers
+in memory while merging groups, larger exports are sorted in temporary files. The keys of "defaults" apply to
+every wallet which does not set them.
+"""
+import argparse
+import contextlib
+import functools
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import walletscan
+
+WALLET_KEYS = ('address', 'name', 'output', 'format', 'start_date', 'end_date', 'workers', 'max_records',
+               'assignments', 'groups', 'currencies', 'aliases')
+
+CONFIG_KEYS = ('jobs', 'workers', 'store', 'token_cache', 'cache', 'rate_limit', 'defaults', 'wallets')
+
+
+class ConfigError(ValueError):
+    """Invalid config file."""
+
+
+class ExportJob(object):
+    """Export of a wallet and its result."""
+
+    def __init__(self, wallet: dict):
+        self.wallet = wallet
+        self.address = wallet['address']
+        self.name = wallet.get('name') or wallet['address']
+        self.output = wallet['output']
+        self.count = None
+        self.seconds = 0.0
+        self.error = None
+
+    def to_dict(self):
+        return {'address': self.address, 'name': self.name, 'output': self.output, 'count': self.count,
+                'seconds': self.seconds, 'error': None if self.error is None else str(self.error)}
+
+
+def _parse_transfer_type(value):
+    """Returns the TransferType of a name like 'Mining' or a value like 'Einzahlung'."""
+    transfer_type = walletscan.TransferType
+    if value in transfer_type.__members__:
+        return transfer_type[value]
+
+    for member in transfer_type:
+        if member.value == value:
+            return member
+
+    raise ConfigError("Unknown transfer type " + repr(value) + ". Available: " +
+                      ', '.join(transfer_type.__members__))
+
+
+def load_config(filename: str):
+    """Loads and checks a config file.
+
+    Arguments:
+        filename {str} -- Json config file.
+
+    Raises:
+        ConfigError: The config is invalid.
+
+    Returns:
+        dict -- Config, the defaults are applied to the wallets.
+    """
+    try:
+        with open(filename, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+    except (OSError, ValueError) as e:
+        raise ConfigError("Can not read config " + filename + ": " + str(e))
+
+    if not isinstance(config, dict) or not isinstance(config.get('wallets'), list):
+        raise ConfigError("The config needs a list of wallets")
+
+    unknown = set(config) - set(CONFIG_KEYS)
+    if unknown:
+        raise ConfigError("Unknown config keys: " + ', '.join(sorted(unknown)))
+
+    defaults = config.get('defaults', {})
+    wallets = []
+    outputs = set()
+
+    for i, wallet in enumerate(config['wallets']):
+        if not isinstance(wallet, dict):
+            raise ConfigError("Wallet " + str(i) + " is not an object")
+
+        wallet = dict(defaults, **wallet)
+        unknown = set(wallet) - set(WALLET_KEYS)
+        if unknown:
+            raise ConfigError("Unknown keys of wallet " + str(i) + ": " + ', '.join(sorted(unknown)))
+
+        for key in ('address', 'output'):
+            if not wallet.get(key):
+                raise ConfigError("Wallet " + str(i) + " has no " + key)
+
+        if wallet['output'] in outputs:
+            raise ConfigError("Wallets export to the same file " + wallet['output'])
+        outputs.add(wallet['output'])
+
+        if wallet.get('format', 'cointracking') not in walletscan.EXPORT_FORMATS:
+            raise ConfigError("Unknown export format " + str(wallet['format']) + " of wallet " + str(i) +
+                              ". Available: " + ', '.join(walletscan.EXPORT_FORMATS))
+
+        for key in ('start_date', 'end_date'):
+            if wallet.get(key) is not None:
+                try:
+                    time.strptime(wallet[key], '%Y-%m-%d %H:%M:%S')
+                except (TypeError, ValueError):
+                    raise ConfigError("Wallet " + str(i) + " has no date of format 'yyyy-mm-dd hh:mm:ss' as " +
+                                      key)
+
+        for assign in wallet.get('assignments', []):
+            assign['type'] = _parse_transfer_type(assign.get('type')).name
+            if not assign.get('from_address') and not assign.get('to_address'):
+                raise ConfigError("Assignment of wallet " + str(i) + " needs from_address or to_address")
+
+        for group in wallet.get('groups', []):
+            if 'currency' not in group or (not group.get('from_address') and not group.get('to_address')):
+                raise ConfigError("Group of wallet " + str(i) + " needs currency and from_address or to_address")
+
+        wallets.append(wallet)
+
+    config['wallets'] = wallets
+    return config
+
+
+def create_exporter(wallet: dict, token_cache=None, transport=None, response_cache=None):
+    """Creates the exporter of a wallet config.
+
+    Arguments:
+        wallet {dict} -- Wallet of the config.
+
+    Keyword Arguments:
+        token_cache {TokenInfoCache} -- Token cache of the exporter. (default: {None})
+        transport {TronTransport} -- Transport of the scanner. None for TronScan.TRANSPORT. (default: {None})
+        response_cache {ResponseCache} -- Response cache of the scanner. None for TronScan.RESPONSE_CACHE.
+                                          (default: {None})
+
+    Returns:
+        CoinTrackingExporter -- Exporter with the assignments, filters and aliases of the wallet.
+    """
+    exporter = walletscan.CoinTrackingExporter(wallet['address'], wallet.get('name'), token_cache, transport,
+                                               response_cache)
+
+    for assign in wallet.get('assignments', []):
+        exporter.add_assign(walletscan.TransferType[assign['type']], assign.get('from_address'),
+                            assign.get('to_address'))
+
+    for group in wallet.get('groups', []):
+        exporter.add_group_filter(group['currency'], group.get('from_address'), group.get('to_address'))
+
+    for currency in wallet.get('currencies', []):
+        exporter.add_currency_filter(currency)
+
+    for currency, alias in wallet.get('aliases', {}).items():
+        exporter.add_currency_alias(currency, alias)
+
+    return exporter
+
+
+def run_jobs(config: dict, jobs: int = None, workers: int = None, out=None):
+    """Runs the exports of the wallets of a config.
+
+    Arguments:
+        config {dict} -- Config as returned by load_config.
+
+    Keyword Arguments:
+        jobs {int} -- Count of wallets which are exported in parallel. None for the config. (default: {None})
+        workers {int} -- Count of pages per wallet which are fetched in parallel. None for the config.
+                         (default: {None})
+        out {file} -- File of the status messages. (default: {sys.stdout})
+
+    Returns:
+        [ExportJob] -- Exports with their results, in order of the config.
+    """
+    out = sys.stdout if out is None else out
+    jobs = jobs if jobs is not None else config.get('jobs', 4)
+    workers = workers if workers is not None else config.get('workers', 1)
+
+    # Cache and rate limit of the config apply to the scanners of this run, not to all TronScan instances
+    response_cache = walletscan.ResponseCache(**config['cache']) if config.get('cache') else None
+    transport = None
+    if config.get('rate_limit'):
+        transport = walletscan.TronTransport(walletscan.RateLimiter(config['rate_limit']))
+
+    token_scanner = walletscan.TronScan(None, transport, response_cache)
+    token_cache = walletscan.TokenInfoCache(filename=config.get('token_cache'),
+                                            fetch=functools.partial(walletscan.TronScan.get_token_info,
+                                                                    scanner=token_scanner))
+    export_jobs = [ExportJob(wallet) for wallet in config['wallets']]
+
+    def run(job):
+        wallet = job.wallet
+        start = time.perf_counter()
+        store = None
+        try:
+            # Every job opens the store on its own, the jobs run in parallel threads
+            store = walletscan.TronStore(config['store']) if config.get('store') else None
+            exporter = create_exporter(wallet, token_cache, transport, response_cache)
+            job.count = exporter.export(job.output, wallet.get('start_date'), wallet.get('end_date'),
+                                        wallet.get('workers', workers), store, wallet.get('format', 'cointracking'),
+                                        exporter.wallet_name, wallet.get('max_records'))
+        except Exception as e:
+            job.error = e
+        finally:
+            if store is not None:
+                store.close()
+        job.seconds = time.perf_counter() - start
+
+        if job.error is None:
+            print("Exported " + str(job.count) + " transfers of " + job.name + " to " + job.output, file=out)
+        else:
+            print("Export of " + job.name + " failed: " + str(job.error), file=out)
+        out.flush()
+
+    with ThreadPoolExecutor(max_workers=max(1, min(jobs, len(export_jobs) or 1))) as executor:
+        list(executor.map(run, export_jobs))
+
+    token_cache.save()
+
+    return export_jobs
+
+
+def format_report(export_jobs: [ExportJob], seconds: float):
+    """Formats the summary of the exports as table.
+
+    Arguments:
+        export_jobs {[ExportJob]} -- Exports.
+        seconds {float} -- Total time.
+
+    Returns:
+        str -- Report.
+    """
+    rows = [('Wallet', 'Transfers', 'Seconds', 'Result')]
+    for job in export_jobs:
+        rows.append((job.name, '-' if job.count is None else str(job.count), '%.1f' % job.seconds,
+                     job.output if job.error is None else 'failed: ' + str(job.error)))
+
+    widths = [max(len(row[i]) for row in rows) for i in range(3)]
+    lines = ['  '.join([row[0].ljust(widths[0]), row[1].rjust(widths[1]), row[2].rjust(widths[2]), row[3]])
+             for row in rows]
+
+    failed = sum(1 for job in export_jobs if job.error is not None)
+    lines.append(str(len(export_jobs) - failed) + ' of ' + str(len(export_jobs)) + ' exports succeeded, ' +
+                 str(sum(job.count or 0 for job in export_jobs)) + ' transfers in %.1f seconds.' % seconds)
+
+    return '\n'.join(lines)
+
+
+def main(argv: [str] = None):
+    """Entry point of the command line interface.
+
+    Keyword Arguments:
+        argv {[str]} -- Arguments. None for sys.argv. (default: {None})
+
+    Returns:
+        int -- Exit code, 0 if all exports succeeded.
+    """
+    parser = argparse.ArgumentParser(prog='walletscan', description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('config', help='Json config file of the wallets.')
+    parser.add_argument('-j', '--jobs', type=int, help='Count of wallets which are exported in parallel.')
+    parser.add_argument('-w', '--workers', type=int, help='Count of pages per wallet which are fetched in parallel.')
+    parser.add_argument('--wallet', action='append', help='Exports only this wallet address or name. Repeatable.')
+    parser.add_argument('--report', help='Writes the summary to this json file.')
+    parser.add_argument('-v', '--verbose', action='store_true', help='Prints the progress of the exports.')
+    args = parser.parse_args(argv)
+
+    try:
+        config = load_config(args.config)
+    except ConfigError as e:
+        print("Error: " + str(e), file=sys.stderr)
+        return 2
+
+    if args.wallet:
+        selected = set(args.wallet)
+        config['wallets'] = [w for w in config['wallets'] if w['address'] in selected or w.get('name') in selected]
+        if not config['wallets']:
+            print("Error: No wallet of the config matches " + ', '.join(args.wallet), file=sys.stderr)
+            return 2
+
+    out = sys.stdout
+    start = time.perf_counter()
+
+    # The exporters print their progress, which is only shown verbose
+    with open(os.devnull, 'w') as devnull:
+        with contextlib.redirect_stdout(out if args.verbose else devnull):
+            export_jobs = run_jobs(config, args.jobs, args.workers, out)
+
+    seconds = time.perf_counter() - start
+    print(format_report(export_jobs, seconds), file=out)
+
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump({'seconds': seconds, 'exports': [job.to_dict() for job in export_jobs]}, f, indent=2)
+
+    return 1 if any(job.error is not None for job in export_jobs) else 0
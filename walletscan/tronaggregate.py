@@ -0,0 +1,275 @@
+import heapq
+from array import array
+from bisect import bisect_right
+from itertools import accumulate
+from operator import itemgetter
+
+from .tronparser import DateFormatter, TransferBatch
+from .trontokencache import TokenInfoCache
+
+
+class _TokenLedger(object):
+    """Balance changes of one token, sorted by timestamp, with lazily accumulated running balances."""
+
+    __slots__ = ('timestamps', 'deltas', 'balances')
+
+    def __init__(self):
+        self.timestamps = array('q')
+        self.deltas = []
+        # Running balances of the first len(balances) changes, the rest is accumulated on the next query
+        self.balances = []
+
+    def extend(self, changes: [tuple]):
+        """Adds balance changes. Changes older than the newest change are merged into the sorted columns.
+
+        Arguments:
+            changes {[(int, int)]} -- Timestamp and raw amount of the changes, sorted by timestamp.
+        """
+        if not changes:
+            return
+
+        if not self.timestamps or changes[0][0] >= self.timestamps[-1]:
+            self.timestamps.extend(c[0] for c in changes)
+            self.deltas.extend(c[1] for c in changes)
+            return
+
+        index = bisect_right(self.timestamps, changes[0][0])
+        merged = list(heapq.merge(zip(self.timestamps[index:], self.deltas[index:]), changes, key=itemgetter(0)))
+
+        del self.timestamps[index:]
+        del self.deltas[index:]
+        del self.balances[index:]
+        self.timestamps.extend(c[0] for c in merged)
+        self.deltas.extend(c[1] for c in merged)
+
+    def update(self):
+        """Accumulates the running balances of the new changes."""
+        start = len(self.balances)
+        if start < len(self.deltas):
+            initial = self.balances[-1] if self.balances else 0
+            self.balances.extend(accumulate(self.deltas[start:], initial=initial))
+            # accumulate yields the initial value first
+            del self.balances[start]
+
+    def balance(self, timestamp: int = None):
+        """Raw balance after all changes up to and including the timestamp."""
+        self.update()
+        if not self.balances:
+            return 0
+        if timestamp is None:
+            return self.balances[-1]
+
+        index = bisect_right(self.timestamps, timestamp)
+        return self.balances[index - 1] if index > 0 else 0
+
+
+class PortfolioAggregator(object):
+    """Aggregates the transfers of a wallet to balances over time, counterparty totals and periodic flows.
+
+    Transfers can be added at any time, the aggregates are updated incrementally. The balance changes of every
+    token are kept in timestamp sorted columns and the running balances are only accumulated from the first
+    changed position on. Transfers with an id which was already added are skipped, so overlapping scans can be
+    added again.
+    """
+
+    # Date formats of the keys of the periods
+    PERIODS = {'day': '%Y-%m-%d', 'month': '%Y-%m'}
+
+    # Precision of TRX, which has the token name '_'
+    TRX_PRECISION = 6
+
+    def __init__(self, wallet_address: str, token_cache: TokenInfoCache = None, precisions: dict = None,
+                 timezone: str = None):
+        """
+        Arguments:
+            wallet_address {str} -- Address of wallet.
+
+        Keyword Arguments:
+            token_cache {TokenInfoCache} -- Cache of the token precisions. (default: {TokenInfoCache()})
+            precisions {dict} -- Precision of tokens which are not looked up in the token cache. (default: {None})
+            timezone {str} -- Timezone of the days and months. (default: {None})
+        """
+        self.wallet_address = wallet_address
+        self.token_cache = token_cache
+        self.precisions = {'_': self.TRX_PRECISION}
+        if precisions:
+            self.precisions.update(precisions)
+        self.timezone = timezone
+        self.count = 0
+
+        self._ids = set()
+        self._ledgers = {}
+        # Raw incoming and outgoing amounts by token and counterparty
+        self._counterparties = {}
+        # Count and raw incoming and outgoing amounts by period, token and date key
+        self._buckets = {period: {} for period in self.PERIODS}
+        self._formatters = {period: DateFormatter.get(timezone, fmt) for period, fmt in self.PERIODS.items()}
+
+    def _precision(self, token: str):
+        precision = self.precisions.get(token)
+        if precision is None:
+            if self.token_cache is None:
+                self.token_cache = TokenInfoCache()
+            precision = self.precisions[token] = self.token_cache.get_precision(token)
+        return precision
+
+    def _scale(self, token: str, amount: int):
+        return amount / (10**self._precision(token))
+
+    def add(self, transfers):
+        """Adds transfers and updates the aggregates.
+
+        Arguments:
+            transfers {[TronTransfer]} -- Transfers or TransferBatch.
+
+        Returns:
+            int -- Count of added transfers which involve the wallet.
+        """
+        if isinstance(transfers, TransferBatch):
+            strings = transfers.strings
+            rows = zip(transfers.ids, transfers.timestamps, (strings[i] for i in transfers.from_addresses),
+                       (strings[i] for i in transfers.to_addresses), transfers.amounts,
+                       (strings[i] for i in transfers.token_names))
+        else:
+            rows = ((t.id, t.timestamp, t.from_address, t.to_address, t.amount, t.token_name) for t in transfers)
+
+        wallet = self.wallet_address
+        ids = self._ids
+        changes = {}
+        count = 0
+
+        for tid, timestamp, from_address, to_address, amount, token in rows:
+            incoming = to_address == wallet
+            outgoing = from_address == wallet
+            if not incoming and not outgoing:
+                continue
+
+            # Merged transfers have no id and are never skipped
+            if tid is not None:
+                if tid in ids:
+                    continue
+                ids.add(tid)
+
+            count += 1
+            amount_in = amount if incoming else 0
+            amount_out = amount if outgoing else 0
+            changes.setdefault(token, []).append((timestamp, amount_in - amount_out))
+
+            counterparties = self._counterparties.setdefault(token, {})
+            if incoming:
+                totals = counterparties.setdefault(from_address, [0, 0, 0])
+                totals[0] += 1
+                totals[1] += amount
+            if outgoing:
+                totals = counterparties.setdefault(to_address, [0, 0, 0])
+                totals[0] += 1
+                totals[2] += amount
+
+            for period, formatter in self._formatters.items():
+                key = formatter.format(timestamp)
+                totals = self._buckets[period].setdefault(token, {}).setdefault(key, [0, 0, 0])
+                totals[0] += 1
+                totals[1] += amount_in
+                totals[2] += amount_out
+
+        for token, token_changes in changes.items():
+            token_changes.sort(key=itemgetter(0))
+            self._ledgers.setdefault(token, _TokenLedger()).extend(token_changes)
+
+        self.count += count
+        return count
+
+    def tokens(self):
+        """Returns the tokens of the added transfers.
+
+        Returns:
+            [str] -- Token names.
+        """
+        return sorted(self._ledgers)
+
+    def balance(self, token: str, timestamp: int = None):
+        """Returns the balance of a token.
+
+        Arguments:
+            token {str} -- Token name.
+
+        Keyword Arguments:
+            timestamp {int} -- Balance after all transfers up to this timestamp. None for the current balance.
+                               (default: {None})
+
+        Returns:
+            float -- Balance with the precision of the token applied.
+        """
+        ledger = self._ledgers.get(token)
+        return self._scale(token, ledger.balance(timestamp) if ledger is not None else 0)
+
+    def balances(self, timestamp: int = None):
+        """Returns the balances of all tokens.
+
+        Keyword Arguments:
+            timestamp {int} -- Balances after all transfers up to this timestamp. None for the current balances.
+                               (default: {None})
+
+        Returns:
+            dict -- Balance of each token.
+        """
+        return {token: self.balance(token, timestamp) for token in self.tokens()}
+
+    def balance_series(self, token: str):
+        """Returns the balance of a token after every transfer.
+
+        Arguments:
+            token {str} -- Token name.
+
+        Returns:
+            [(int, float)] -- Timestamp and balance, oldest first.
+        """
+        ledger = self._ledgers.get(token)
+        if ledger is None:
+            return []
+
+        ledger.update()
+        scale = 10**self._precision(token)
+        return [(ts, balance / scale) for ts, balance in zip(ledger.timestamps, ledger.balances)]
+
+    def counterparties(self, token: str):
+        """Returns the totals of the transfers with each counterparty.
+
+        Arguments:
+            token {str} -- Token name.
+
+        Returns:
+            dict -- Count, incoming, outgoing and net amount of each counterparty address.
+        """
+        scale = 10**self._precision(token)
+        return {address: {'count': count, 'in': amount_in / scale, 'out': amount_out / scale,
+                          'net': (amount_in - amount_out) / scale}
+                for address, (count, amount_in, amount_out) in self._counterparties.get(token, {}).items()}
+
+    def buckets(self, token: str, period: str = 'day'):
+        """Returns the flows of a token per day or month.
+
+        Arguments:
+            token {str} -- Token name.
+
+        Keyword Arguments:
+            period {str} -- 'day' or 'month'. (default: {'day'})
+
+        Returns:
+            [dict] -- Date, count, incoming, outgoing and net amount and the balance at the end of each period,
+                      oldest first. Periods without transfers are left out.
+        """
+        if period not in self.PERIODS:
+            raise ValueError("Unknown period " + str(period) + ". Available: " + ', '.join(self.PERIODS))
+
+        scale = 10**self._precision(token)
+        buckets = []
+        balance = 0
+
+        # The keys of the date formats sort chronologically
+        for key, (count, amount_in, amount_out) in sorted(self._buckets[period].get(token, {}).items()):
+            balance += amount_in - amount_out
+            buckets.append({'date': key, 'count': count, 'in': amount_in / scale, 'out': amount_out / scale,
+                            'net': (amount_in - amount_out) / scale, 'balance': balance / scale})
+
+        return buckets
@@ -0,0 +1,521 @@
+import asyncio
+import heapq
+import sys
+import time
+from collections import deque
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+from .tronmetrics import get_instrumentation
+from .tronparser import TronTransaction, TronTransfer, decode_json
+from .tronscanner import TronScan
+from .trontransport import TronScanError
+
+
+class AsyncTronScan(object):
+    """Scanner of a wallet for asyncio applications. Requires aiohttp.
+
+    The requests are sent on the event loop, so many scanners and pages share one loop and one connection pool
+    instead of one thread per request. At most `concurrency` requests of a scanner are in flight. Parameters and
+    results are the same as of TronScan. Rate limiter, retries, backoff and timeout are taken from
+    TronScan.TRANSPORT and the response cache from TronScan.RESPONSE_CACHE.
+    """
+
+    def __init__(self, wallet_address: str, concurrency: int = 32, session=None):
+        """
+        Arguments:
+            wallet_address {str} -- Address of wallet.
+
+        Keyword Arguments:
+            concurrency {int} -- Maximum count of requests in flight. (default: {32})
+            session {aiohttp.ClientSession} -- Session of the requests, which is not closed by the scanner. None
+                                               for a session of the scanner. (default: {None})
+
+        Raises:
+            ImportError: aiohttp is not installed.
+        """
+        if aiohttp is None:
+            raise ImportError("AsyncTronScan requires aiohttp, install it with 'pip install aiohttp'")
+
+        self.wallet_address = wallet_address
+        self.concurrency = max(1, concurrency)
+        # The parameters are built by a synchronous scanner of the same wallet
+        self.scanner = TronScan(wallet_address)
+
+        self._session = session
+        self._own_session = session is None
+        self._semaphore = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def close(self):
+        """Closes the session of the scanner."""
+        if self._own_session and self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def _get_session(self):
+        # Session and semaphore are created in the running event loop
+        if self._session is None:
+            self._session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=self.concurrency))
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        return self._session
+
+    async def _get(self, url: str, params: str = None):
+        """Sends a GET request with the retries, backoff and rate limiter of TronScan.TRANSPORT.
+
+        Arguments:
+            url {str} -- Url of the request.
+
+        Keyword Arguments:
+            params {str} -- Request parameters. (default: {None})
+
+        Raises:
+            TronScanError: The request failed with all retries.
+
+        Returns:
+            (int, bytes) -- Status and body of the successful response.
+        """
+        transport = TronScan.TRANSPORT
+        session = self._get_session()
+        timeout = aiohttp.ClientTimeout(total=transport.timeout)
+        if params:
+            url += '?' + params
+        error = None
+
+        for attempt in range(0, transport.retries + 1):
+            rate_limiter = transport.rate_limiter
+            if rate_limiter is not None:
+                wait = rate_limiter.try_acquire()
+                while wait > 0:
+                    await asyncio.sleep(wait)
+                    wait = rate_limiter.try_acquire()
+
+            try:
+                async with session.get(url, timeout=timeout) as response:
+                    if response.status == 200:
+                        return response.status, await response.read()
+
+                    error = "Request " + url + " failed with status " + str(response.status)
+                    if response.status not in transport.RETRY_STATUS:
+                        raise TronScanError(error)
+
+                    delay = transport._retry_after(response)
+                    if delay is None:
+                        delay = transport._backoff_delay(attempt)
+            except (asyncio.TimeoutError, aiohttp.ClientError) as e:
+                error = "Request " + url + " failed: " + (str(e) or type(e).__name__)
+                delay = transport._backoff_delay(attempt)
+
+            if attempt < transport.retries:
+                await asyncio.sleep(delay)
+
+        raise TronScanError(error + " (" + str(transport.retries) + " retries)")
+
+    async def _request_content(self, path: str, req_param: str, decode=False):
+        """Sends a request to the tronscan api and returns the undecoded response body.
+
+        The files of the response cache are read and written in threads, so they do not block the event loop.
+
+        Arguments:
+            path {str} -- Api path.
+            req_param {str} -- Request parameters
+
+        Keyword Arguments:
+            decode {bool} -- Returns the decoded response. The response cache reuses it. (default: {False})
+
+        Raises:
+            TronScanError: The request failed with all retries or is missing in a replay-only response cache.
+
+        Returns:
+            bytes -- Response body, or json if decode is set.
+        """
+        start = time.perf_counter()
+        cache = TronScan.RESPONSE_CACHE
+
+        if cache is not None:
+            content = await asyncio.to_thread(cache.get, path, req_param)
+            if content is not None:
+                get_instrumentation().on_request(path, 'cached', time.perf_counter() - start, len(content))
+                return decode_json(content) if decode else content
+
+        self._get_session()
+        async with self._semaphore:
+            try:
+                status, content = await self._get(TronScan.API_URL_BASE + path, req_param)
+            except TronScanError:
+                get_instrumentation().on_request(path, 'error', time.perf_counter() - start, 0)
+                raise
+
+        get_instrumentation().on_request(path, status, time.perf_counter() - start, len(content))
+
+        data = decode_json(content) if decode else None
+
+        if cache is not None:
+            await asyncio.to_thread(cache.put, path, req_param, content, data)
+
+        return data if decode else content
+
+    async def _request_api(self, path: str, req_param: str):
+        """Sends a request to the tronscan api.
+
+        Arguments:
+            path {str} -- Api path.
+            req_param {str} -- Request parameters
+
+        Returns:
+            json -- Response of request.
+        """
+        return await self._request_content(path, req_param, True)
+
+    async def get_token_info(self, token_id: str):
+        """Request information of token from Tron network.
+
+        Arguments:
+            token_id {str} -- Id of token.
+
+        Returns:
+            json -- Token informations.
+        """
+        return await self._request_api(TronScan.TOKEN_PATH, TronScan.TOKEN_PARAMS['id'] + token_id)
+
+    async def _request_total(self, path: str, params: dict, ts_start: int = None, ts_end: int = None,
+                             token: str = None):
+        """Requests the total count of entries of a wallet query, see TronScan._request_total."""
+        js = await self._request_api(path, self.scanner._build_param(params, 1, ts_start, ts_end, token))
+        return js['total']
+
+    async def _request_page(self, path: str, param: str, index: int):
+        """Requests the entries of a page, see TronScan._request_page."""
+        js = await self._request_api(path, param + str(index * TronScan.PAGE_LIMIT))
+        return js['data']
+
+    async def _request_records(self, path: str, param: str, index: int, parse, ts_start: int = None,
+                               ts_end: int = None):
+        """Requests a page and converts its entries within the date range to records, see
+        TronScan._request_records."""
+        page = await self._request_page(path, param, index)
+
+        if ts_start is not None or ts_end is not None:
+            page = [d for d in page if (ts_start is None or int(d['timestamp']) >= ts_start) and
+                    (ts_end is None or int(d['timestamp']) <= ts_end)]
+
+        return parse(page)
+
+    async def iter_pages(self, path: str, param: str, total: int, verbose=False, request=None):
+        """Iterates over all pages of a query in offset order.
+
+        The pages are requested concurrently. At most two pages per allowed request are requested ahead of the
+        page which is yielded next, so the memory usage does not depend on the total count.
+
+        Arguments:
+            path {str} -- Api path.
+            param {str} -- Request parameters ending with the start index parameter.
+            total {int} -- Total count of entries.
+
+        Keyword Arguments:
+            verbose {bool} -- Prints process status. (default: {False})
+            request {coroutine function} -- Requests a page by path, parameters and index.
+                                            (default: {self._request_page})
+
+        Yields:
+            list -- Entries of a page.
+        """
+        request = self._request_page if request is None else request
+        page_count = TronScan._page_count(total)
+
+        if verbose:
+            sys.stdout.write("\r0%")
+
+        # Time spent on fetching, without the time the consumer spends on the yielded pages
+        fetched = 0
+        elapsed = 0.0
+
+        tasks = deque()
+        try:
+            next_index = 0
+            for _ in range(0, page_count):
+                while next_index < page_count and len(tasks) < 2 * self.concurrency:
+                    tasks.append(asyncio.ensure_future(request(path, param, next_index)))
+                    next_index += 1
+
+                start = time.perf_counter()
+                page = await tasks.popleft()
+                elapsed += time.perf_counter() - start
+                fetched += 1
+                if verbose:
+                    sys.stdout.write("\r%d%%" % ((fetched / page_count) * 100))
+                yield page
+        finally:
+            for task in tasks:
+                task.cancel()
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+            get_instrumentation().on_pages(path, fetched, elapsed)
+
+    async def _fetch_pages(self, path: str, param: str, total: int, verbose=True):
+        """Fetches all pages of a query.
+
+        Arguments:
+            path {str} -- Api path.
+            param {str} -- Request parameters ending with the start index parameter.
+            total {int} -- Total count of entries.
+
+        Keyword Arguments:
+            verbose {bool} -- Prints process status. (default: {True})
+
+        Returns:
+            list -- Entries of all pages.
+        """
+        data = []
+        async for page in self.iter_pages(path, param, total, verbose):
+            data.extend(page)
+
+        return data
+
+    async def get_transfers(self, tokens: [str] = None, ts_start: int = None, ts_end: int = None, verbose=True):
+        """Fetches the transfers of wallet.
+
+        Keyword Arguments:
+            tokens {[str]} -- List of tokens which will be fetched. None for all tokens. (default: {None})
+            ts_start {int} -- Start timestamp of date range. (default: {None})
+            ts_end {int} -- End timestamp of date range.  (default: {None})
+            verbose {bool} -- Prints process status. (default: {True})
+
+        Returns:
+            json -- Transfers.
+        """
+        if verbose:
+            print("Receiving transfers ...")
+
+        totals = await self._token_totals(tokens, ts_start, ts_end) if tokens else None
+        if totals is not None:
+            return await self._fetch_token_transfers(totals, ts_start, ts_end, verbose)
+
+        total = await self._request_total(TronScan.TRANSFER_PATH, TronScan.TRANSFER_PARAMS, ts_start, ts_end)
+
+        if verbose:
+            print("Total count of transfers to receive: " + str(total))
+
+        param = self.scanner._page_param(TronScan.TRANSFER_PARAMS, ts_start, ts_end)
+        data = {'total': total, 'data': await self._fetch_pages(TronScan.TRANSFER_PATH, param, total, verbose)}
+
+        if verbose:
+            print('\n' + str(len(data['data'])) + ' transfers received.')
+
+        if tokens:
+            token_set = set(tokens)
+            data['data'] = [d for d in data['data'] if d['tokenName'] in token_set]
+
+        data['total'] = len(data['data'])
+
+        return data
+
+    async def _token_totals(self, tokens: [str], ts_start: int = None, ts_end: int = None):
+        """Requests the total count of transfers of each token, see TronScan._token_totals.
+
+        Returns:
+            dict -- Total count of each token or None if the api ignores the token filter.
+        """
+        tokens = list(dict.fromkeys(tokens))
+        responses = await asyncio.gather(*[self._request_api(
+            TronScan.TRANSFER_PATH, self.scanner._build_param(TronScan.TRANSFER_PARAMS, 1, ts_start, ts_end, token))
+            for token in tokens])
+
+        totals = {}
+        for token, js in zip(tokens, responses):
+            if any(d['tokenName'] != token for d in js['data']):
+                return None
+            totals[token] = js['total']
+
+        return totals
+
+    async def _fetch_token_transfers(self, totals: dict, ts_start: int = None, ts_end: int = None, verbose=True):
+        """Fetches the transfers of several tokens with one query per token and merges them by timestamp.
+
+        Arguments:
+            totals {dict} -- Total count of transfers of each token.
+
+        Keyword Arguments:
+            ts_start {int} -- Start timestamp of date range. (default: {None})
+            ts_end {int} -- End timestamp of date range.  (default: {None})
+            verbose {bool} -- Prints process status. (default: {True})
+
+        Returns:
+            json -- Transfers, newest first.
+        """
+        tokens = [t for t, total in totals.items() if total > 0]
+
+        if verbose:
+            print("Total count of transfers to receive: " + str(sum(totals.values())) + " of " +
+                  str(len(totals)) + " tokens")
+
+        pages = await asyncio.gather(*[self._fetch_pages(
+            TronScan.TRANSFER_PATH, self.scanner._page_param(TronScan.TRANSFER_PARAMS, ts_start, ts_end, token),
+            totals[token], False) for token in tokens])
+
+        # Set based filtering remains, in case the api ignores the filter for a query
+        token_set = set(totals)
+        data = [d for d in heapq.merge(*pages, key=lambda d: -int(d['timestamp'])) if d['tokenName'] in token_set]
+
+        if verbose:
+            print(str(len(data)) + ' transfers received.')
+
+        return {'total': len(data), 'data': data}
+
+    async def get_all_transactions(self, ts_start: int = None, ts_end: int = None):
+        """Fetches all transactions of wallet.
+
+        Keyword Arguments:
+            ts_start {int} -- Start timestamp of date range. (default: {None})
+            ts_end {int} -- End timestamp of date range.  (default: {None})
+
+        Returns:
+            json -- Transactions.
+        """
+        total = await self._request_total(TronScan.TRANSACTION_PATH, TronScan.TRANSACTION_PARAMS, ts_start, ts_end)
+        print("Total count of transcations to receive: " + str(total))
+
+        param = self.scanner._page_param(TronScan.TRANSACTION_PARAMS, ts_start, ts_end)
+        data = {'total': total, 'data': await self._fetch_pages(TronScan.TRANSACTION_PATH, param, total, True)}
+
+        data_len = len(data['data'])
+        data['total'] = data_len
+        print('\n' + str(data_len) + ' transcations received.')
+
+        return data
+
+    async def iter_transfers(self, tokens: [str] = None, ts_start: int = None, ts_end: int = None, verbose=False,
+                             keep_data=False):
+        """Iterates over the transfers of wallet page by page.
+
+        Keyword Arguments:
+            tokens {[str]} -- List of tokens which will be yielded. None for all tokens. (default: {None})
+            ts_start {int} -- Start timestamp of date range. (default: {None})
+            ts_end {int} -- End timestamp of date range.  (default: {None})
+            verbose {bool} -- Prints process status. (default: {False})
+            keep_data {bool} -- Keeps the data payload of the transfers, otherwise data is None. (default: {False})
+
+        Yields:
+            TronTransfer -- Transfer.
+        """
+        if verbose:
+            print("Receiving transfers ...")
+
+        token_set = set(tokens) if tokens else None
+        totals = await self._token_totals(tokens, ts_start, ts_end) if tokens else None
+        from_entry = TronTransfer.from_entry
+
+        def parse(page):
+            start = time.perf_counter()
+            transfers = [from_entry(d, keep_data) for d in page if token_set is None or d['tokenName'] in token_set]
+            get_instrumentation().on_parse('transfers', len(transfers), time.perf_counter() - start)
+            return transfers
+
+        async def request(path, param, index):
+            return await self._request_records(path, param, index, parse, ts_start, ts_end)
+
+        async def stream(stream_total, stream_verbose, token=None):
+            param = self.scanner._page_param(TronScan.TRANSFER_PARAMS, ts_start, ts_end, token)
+            async for page in self.iter_pages(TronScan.TRANSFER_PATH, param, stream_total, stream_verbose, request):
+                for transfer in page:
+                    yield transfer
+
+        if totals is None:
+            total = await self._request_total(TronScan.TRANSFER_PATH, TronScan.TRANSFER_PARAMS, ts_start, ts_end)
+            transfers = stream(total, verbose)
+        else:
+            # One query per token, the streams are fetched concurrently and merged newest first
+            total = sum(totals.values())
+            transfers = self._merge_newest_first([stream(totals[t], False, t) for t, token_total in totals.items()
+                                                  if token_total > 0])
+
+        if verbose:
+            print("Total count of transfers to receive: " + str(total))
+
+        count = 0
+
+        async for transfer in transfers:
+            count += 1
+            yield transfer
+
+        if verbose:
+            print('\n' + str(count) + ' transfers received.')
+
+    @staticmethod
+    async def _merge_newest_first(streams: list):
+        """Merges streams of records which are each sorted newest first, like heapq.merge of TronScan.
+
+        Arguments:
+            streams {list} -- Async generators of records with a timestamp.
+
+        Yields:
+            object -- Record, records with equal timestamps in order of the streams.
+        """
+        heap = []
+        try:
+            for i, records in enumerate(streams):
+                async for record in records:
+                    heap.append((-record.timestamp, i, record))
+                    break
+            heapq.heapify(heap)
+
+            while heap:
+                _, i, record = heap[0]
+                yield record
+                async for record in streams[i]:
+                    heapq.heapreplace(heap, (-record.timestamp, i, record))
+                    break
+                else:
+                    heapq.heappop(heap)
+        finally:
+            for records in streams:
+                await records.aclose()
+
+    async def iter_transactions(self, ts_start: int = None, ts_end: int = None, verbose=False, keep_data=False):
+        """Iterates over the transactions of wallet page by page.
+
+        Keyword Arguments:
+            ts_start {int} -- Start timestamp of date range. (default: {None})
+            ts_end {int} -- End timestamp of date range.  (default: {None})
+            verbose {bool} -- Prints process status. (default: {False})
+            keep_data {bool} -- Keeps the data payload of the transactions, otherwise data is None.
+                                (default: {False})
+
+        Yields:
+            TronTransaction -- Transaction.
+        """
+        total = await self._request_total(TronScan.TRANSACTION_PATH, TronScan.TRANSACTION_PARAMS, ts_start, ts_end)
+
+        if verbose:
+            print("Total count of transcations to receive: " + str(total))
+
+        from_entry = TronTransaction.from_entry
+
+        def parse(page):
+            start = time.perf_counter()
+            transactions = [from_entry(d, keep_data) for d in page]
+            get_instrumentation().on_parse('transactions', len(transactions), time.perf_counter() - start)
+            return transactions
+
+        async def request(path, param, index):
+            return await self._request_records(path, param, index, parse, ts_start, ts_end)
+
+        param = self.scanner._page_param(TronScan.TRANSACTION_PARAMS, ts_start, ts_end)
+        count = 0
+
+        async for page in self.iter_pages(TronScan.TRANSACTION_PATH, param, total, verbose, request):
+            for transaction in page:
+                count += 1
+                yield transaction
+
+        if verbose:
+            print('\n' + str(count) + ' transcations received.')
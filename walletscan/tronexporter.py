@@ -1,8 +1,8 @@
 from enum import Enum
 import walletscan
-import codecs
 import time
 from datetime import datetime
+from itertools import islice
 
 
 class TransferType(Enum):
@@ -18,15 +18,122 @@ class TransferType(Enum):
     Loss = 'Verlust'
 
 
+class TransferClassifier(object):
+    """Assigns transfer types to transfers.
+
+    The assignments are compiled into lookup tables by sender and destination address. As with a linear scan
+    over the assignments, the first added assignment which matches a transfer wins. Transfers without
+    assignment are declared as deposits or withdrawals of the wallet.
+    """
+
+    # Transfer types which are exported as buy, all others are exported as sell
+    INCOMING_TYPES = frozenset([TransferType.Deposit, TransferType.Revenues, TransferType.Mining,
+                                TransferType.GiftIn])
+
+    def __init__(self, wallet_address: str, assignments: [dict]):
+        """
+        Arguments:
+            wallet_address {str} -- Address of wallet.
+            assignments {[dict]} -- Assignments as created by TronTransferExporter.add_assign().
+        """
+        self.wallet_address = wallet_address
+        self._from_types = {}
+        self._to_types = {}
+
+        for i, assign in enumerate(assignments):
+            self._from_types.setdefault(assign['from_address'], (i, assign['transfer_type']))
+            self._to_types.setdefault(assign['to_address'], (i, assign['transfer_type']))
+
+    def classify(self, transfer: walletscan.TronTransfer):
+        """Determines the type of a transfer.
+
+        Arguments:
+            transfer {TronTransfer} -- Transfer.
+
+        Returns:
+            TransferType -- Type of the transfer. None, if the transfer does not belong to the wallet.
+        """
+        from_match = self._from_types.get(transfer.from_address)
+        to_match = self._to_types.get(transfer.to_address)
+
+        if from_match is not None and (to_match is None or from_match[0] <= to_match[0]):
+            return from_match[1]
+        if to_match is not None:
+            return to_match[1]
+
+        if transfer.to_address == self.wallet_address:
+            return TransferType.Deposit
+        if transfer.from_address == self.wallet_address:
+            return TransferType.Withdrawal
+        return None
+
+    def classify_all(self, transfers: [walletscan.TronTransfer]):
+        """Determines the types of all transfers in one pass.
+
+        Arguments:
+            transfers {[TronTransfer]} -- Transfers.
+
+        Returns:
+            [TransferType] -- Types of the transfers.
+        """
+        from_get = self._from_types.get
+        to_get = self._to_types.get
+        wallet_address = self.wallet_address
+        deposit = TransferType.Deposit
+        withdrawal = TransferType.Withdrawal
+        types = []
+
+        for t in transfers:
+            from_match = from_get(t.from_address)
+            to_match = to_get(t.to_address)
+
+            if from_match is not None and (to_match is None or from_match[0] <= to_match[0]):
+                types.append(from_match[1])
+            elif to_match is not None:
+                types.append(to_match[1])
+            elif t.to_address == wallet_address:
+                types.append(deposit)
+            elif t.from_address == wallet_address:
+                types.append(withdrawal)
+            else:
+                types.append(None)
+
+        return types
+
+    def classify_iter(self, transfers):
+        """Determines the types of streamed transfers.
+
+        Arguments:
+            transfers {[TronTransfer]} -- Iterable of transfers.
+
+        Yields:
+            (TronTransfer, TransferType) -- Transfer and its type.
+        """
+        for t in transfers:
+            yield t, self.classify(t)
+
+    @staticmethod
+    def is_incoming(transfer_type: TransferType):
+        """True, if the transfer type is exported as buy."""
+        return transfer_type in TransferClassifier.INCOMING_TYPES
+
+
 class TronTransferExporter(object):
     """Exporter Class for Tron transfers."""
 
-    def __init__(self, wallet_address):
+    # Count of streamed transfers whose missing token informations are fetched together
+    PREFETCH_CHUNK = 1000
+
+    def __init__(self, wallet_address, token_cache=None, transport=None, response_cache=None):
         self.wallet_address = wallet_address
+        # Transport and response cache of the scanner, None for the ones of TronScan
+        self.transport = transport
+        self.response_cache = response_cache
         self.assignments = []
         self.group_filters = []
         self.currency_filters = []
         self.currency_aliases = {}
+        self.token_cache = token_cache if token_cache is not None else walletscan.TokenInfoCache()
 
     def add_assign(self, transfer_type: TransferType, from_address=None, to_address=None):
         """
@@ -87,112 +194,106 @@ class TronTransferExporter(object):
         self.group_filters.append(
             {'currency': currency, 'from_address': from_address, 'to_address': to_address})
 
+    def compile_assignments(self):
+        """Compiles the transfer assignments for the classification of transfers.
+
+        Returns:
+            TransferClassifier -- Classifier of the assignments.
+        """
+        return TransferClassifier(self.wallet_address, self.assignments)
+
+    def _group_filter_index(self):
+        """Indexes the group filters by sender and destination address.
+
+        Returns:
+            (dict, dict) -- Index of the first filter of each sender and of each destination address.
+        """
+        from_index = {}
+        to_index = {}
+        for i, g_filter in enumerate(self.group_filters):
+            if g_filter['from_address'] is not None:
+                from_index.setdefault(g_filter['from_address'], i)
+            if g_filter['to_address'] is not None:
+                to_index.setdefault(g_filter['to_address'], i)
+
+        return from_index, to_index
+
+    def _iter_group_keys(self, transfers, fields):
+        """Assigns timestamp sorted transfers to groups in one pass.
+
+        The group filters are indexed by sender and destination address, so every transfer is assigned with two
+        lookups. The first matching filter wins and a filter matches by sender address before destination
+        address. A group holds consecutive grouped transfers of a token from the same sender or to the same
+        destination, an ungrouped transfer of the token in between starts a new group.
+
+        Arguments:
+            transfers {iterable} -- Transfers or transfer records sorted by timestamp.
+            fields {callable} -- Returns sender address, destination address and token of a transfer.
+
+        Yields:
+            (object, tuple) -- Transfer and its group as (token order, group index), or None if it is not grouped.
+        """
+        from_index, to_index = self._group_filter_index()
+
+        # Open group of each token as (token order, group index, is_outgoing, address)
+        open_groups = {}
+        # Tokens with ungrouped transfers since their last group, their next grouped transfer starts a new group
+        new_group_currenys = set()
+
+        for t in transfers:
+            from_address, to_address, token = fields(t)
+            i_from = from_index.get(from_address)
+            i_to = to_index.get(to_address)
+
+            if i_from is not None and (i_to is None or i_from <= i_to):
+                run = (False, from_address)
+            elif i_to is not None:
+                run = (True, to_address)
+            else:
+                if token in open_groups:
+                    new_group_currenys.add(token)
+                yield t, None
+                continue
+
+            group = open_groups.get(token)
+            if group is None:
+                group = (len(open_groups), 0) + run
+            elif group[2:] != run or token in new_group_currenys:
+                # The current transfer does not fit into the group, a new group is created
+                group = (group[0], group[1] + 1) + run
+                new_group_currenys.discard(token)
+            open_groups[token] = group
+
+            yield t, group[:2]
+
     def _group_transfers(self, transfers: [walletscan.TronTransfer]):
-        """Groups the transfers for merging.
+        """Groups the transfers for merging, see _iter_group_keys.
         
         Arguments:
-            transfers {[TronTransfer]} -- Transfers which will be grouped.
+            transfers {[TronTransfer]} -- Transfers or TransferBatch which will be grouped.
         
         Returns:
-            dict -- Grouped transfers.
+            ([[TronTransfer]], [TronTransfer]) -- Groups by token and time, and the ungrouped transfers.
         """
         if not self.group_filters:
             return {}, transfers
 
-        sorted_tr = sorted(transfers, key=lambda x: x.timestamp)
+        if isinstance(transfers, walletscan.TransferBatch):
+            sorted_tr = transfers.sort_by_timestamp()
+        else:
+            sorted_tr = sorted(transfers, key=lambda x: x.timestamp)
 
         grouped_tr = {}
         ungrouped_tr = []
-        new_group_currenys = []
-        for t in sorted_tr:
-            for g_filter in self.group_filters:
-                is_grouped = False
-
-                # deposit
-                if g_filter['from_address'] is not None and g_filter['from_address'] == t.from_address:
-                    # Add token as a new category, if the category doesn't exist yet
-                    if t.token_name not in grouped_tr:
-                        grouped_tr[t.token_name] = {'count': 0, 'groups': []}
-
-                    # Add new Group, if the token has nos group yet
-                    if grouped_tr[t.token_name]['count'] == 0:
-                        grouped_tr[t.token_name]['groups'].append({'is_outgoing': False,
-                                                                   'address': t.from_address,
-                                                                   'transfers': []})
-                        grouped_tr[t.token_name]['count'] = 1
-
-                    # Current group index
-                    group_index = grouped_tr[t.token_name]['count'] - 1
-
-                    # If the current transfer does not fit into the group, new group will be created
-                    if grouped_tr[t.token_name]['groups'][group_index]['is_outgoing'] or \
-                       grouped_tr[t.token_name]['groups'][group_index]['address'] != t.from_address or \
-                       t.token_name in new_group_currenys:
-
-                        # Add new group
-                        grouped_tr[t.token_name]['groups'].append({'is_outgoing': False,
-                                                                   'address': t.from_address,
-                                                                   'transfers': []})
-
-                        grouped_tr[t.token_name]['count'] += 1
-                        group_index = grouped_tr[t.token_name]['count'] - 1
-                        if t.token_name in new_group_currenys:
-                            new_group_currenys.remove(t.token_name)
-
-                    # Add transfer to group
-                    grouped_tr[t.token_name]['groups'][group_index]['transfers'].append(
-                        t)
-                    is_grouped = True
-                    break
-
-                # withdrawal
-                elif g_filter['to_address'] is not None and g_filter['to_address'] == t.to_address:
-                     # Add token as a new category, if the category doesn't exist yet
-                    if t.token_name not in grouped_tr:
-                        grouped_tr[t.token_name] = {'count': 0, 'groups': []}
-
-                    # Add new Group, if the token has nos group yet
-                    if grouped_tr[t.token_name]['count'] == 0:
-                        grouped_tr[t.token_name]['groups'].append({'is_outgoing': True,
-                                                                   'address': t.to_address,
-                                                                   'transfers': []})
-                        grouped_tr[t.token_name]['count'] = 1
-
-                    # Current group index
-                    group_index = grouped_tr[t.token_name]['count'] - 1
-
-                    # If the current transfer does not fit into the group, new group will be created
-                    if grouped_tr[t.token_name]['groups'][group_index]['is_outgoing'] or \
-                       grouped_tr[t.token_name]['groups'][group_index]['address'] != t.to_address or \
-                       t.token_name in new_group_currenys:
-
-                        # Add new group
-                        grouped_tr[t.token_name]['groups'].append({'is_outgoing': True,
-                                                                   'address': t.to_address,
-                                                                   'transfers': []})
-
-                        grouped_tr[t.token_name]['count'] += 1
-                        group_index = grouped_tr[t.token_name]['count'] - 1
-                        if t.token_name in new_group_currenys:
-                            new_group_currenys.remove(t.token_name)
-
-                    # Add transfer to group
-                    grouped_tr[t.token_name]['groups'][group_index]['transfers'].append(
-                        t)
-                    is_grouped = True
-                    break
-
-            if not is_grouped:
-                if t.token_name in grouped_tr and t.token_name not in new_group_currenys:
-                    new_group_currenys.append(t.token_name)
-
-                # Add transfer to the not grouped
+
+        for t, key in self._iter_group_keys(sorted_tr, lambda t: (t.from_address, t.to_address, t.token_name)):
+            if key is None:
                 ungrouped_tr.append(t)
+            else:
+                grouped_tr.setdefault(key, []).append(t)
 
-        groups = []
-        for _, value in grouped_tr.items():
-            for g_filter in value['groups']:
-                groups.append(g_filter['transfers'])
+        # Groups in order of the first grouped transfer of their token
+        groups = [grouped_tr[key] for key in sorted(grouped_tr)]
 
         return groups, ungrouped_tr
 
@@ -233,130 +334,289 @@ class TronTransferExporter(object):
 
         return trs
 
-    def export_csv(self, filename: str, start_date: str = None, end_date: str = None):
-        raise NotImplementedError()
-
+    def _merge_transfers_external(self, transfers, max_records: int):
+        """
+        Merges grouped transfers like _merge_transfers, with at most max_records transfers in memory per sort.
 
-class CoinTrackingExporter(TronTransferExporter):
-    """Exporter class of Tron transfers to a readable file for CoinTracking.info."""
+        The transfers are sorted by timestamp in runs which are spilled to temporary files. The groups are
+        built in one pass over the merged runs, only the open group of each token is kept in memory. The
+        ungrouped and the merged transfers are sorted again into the order of _merge_transfers: by timestamp,
+        ungrouped before merged transfers and merged transfers by token and group.
 
-    def __init__(self, wallet_address, wallet_name=None):
-        super().__init__(wallet_address)
-        self.wallet_name = wallet_name
+        Arguments:
+            transfers {[TronTransfer]} -- Iterable of transfers.
+            max_records {int} -- Maximum count of transfers in memory per sort.
 
-    def export_csv(self, filename: str, start_date: str = None, end_date: str = None):
+        Returns:
+            [TronTransfer] -- Iterator of the ungrouped and merged transfers.
         """
-        Fetches the transfers from the wallet and exports them to a csv file.
+        instrumentation = walletscan.get_instrumentation()
+
+        start = time.perf_counter()
+        by_time = walletscan.ExternalSorter(max_records)
+        tokens = set()
+
+        # The input position breaks timestamp ties like the stable in-memory sort
+        for seq, t in enumerate(transfers):
+            tokens.add(t.token_name)
+            by_time.add((t.timestamp, seq, t.id, t.block, t.transaction_hash, t.from_address, t.to_address,
+                         t.amount, t.token_name, bool(t.confirmed), t.comment))
+        print("Fetching success.")
+
+        self.token_cache.prefetch(t for t in tokens if t != '_')
+        instrumentation.on_export_stage('fetch', by_time.count, time.perf_counter() - start)
+
+        print("Merging grouped transfers ...")
+        start = time.perf_counter()
+        merged = walletscan.ExternalSorter(max_records)
+        try:
+            with by_time:
+                self._group_sorted(by_time, merged)
+        except BaseException:
+            merged.close()
+            raise
+        instrumentation.on_export_stage('group', by_time.count, time.perf_counter() - start)
+        print("Merging success.")
+
+        return self._iter_merged(merged)
+
+    def _group_sorted(self, records, merged):
+        """Groups timestamp sorted transfer records in one pass with the rules of _group_transfers.
 
         Arguments:
-            filename {str} -- Destination file.
-            start_date {str} -- Exports all transfers from including this date. Format: "yyyy-mm-dd hh:mm:ss"
-            end_date {str} -- Exports all transfers up to and including this date. Format: "yyyy-mm-dd hh:mm:ss"
+            records {iterable} -- Transfer records sorted by timestamp and input position.
+            merged {ExternalSorter} -- Receives the ungrouped records with the key (timestamp, 0, position) and
+                                       the merged records with the key (timestamp, 1, token order, group index).
         """
+        formatter = walletscan.DateFormatter.get('Europe/Berlin')
 
-        ts_start = None
-        if start_date is not None:
-            ts_start = time.mktime(datetime.strptime(start_date, '%Y-%m-%d %H:%M:%S').timetuple())
-            ts_start = int(ts_start * 1000)
+        # Open group of each token as [group key, first record, amount, last timestamp]
+        open_groups = {}
 
-        ts_end = None
-        if end_date is not None:
-            ts_end = time.mktime(datetime.strptime(end_date, '%Y-%m-%d %H:%M:%S').timetuple())
-            ts_end = int(ts_end * 1000)
+        def close(token, group):
+            first = group[1]
+            # ToDo localisation
+            comment = 'Grouped ' + formatter.format(first[0]) + ' - ' + formatter.format(group[3])
+            merged.add((group[3], 1) + group[0] +
+                       ((group[3], None, None, None, None, first[5], first[6], group[2], token, first[9], comment),))
+
+        for r, key in self._iter_group_keys(records, lambda r: (r[5], r[6], r[8])):
+            if key is None:
+                merged.add((r[0], 0, r[1], 0, r))
+                continue
+
+            token = r[8]
+            group = open_groups.get(token)
+            if group is None or group[0] != key:
+                if group is not None:
+                    close(token, group)
+                group = open_groups[token] = [key, r, 0, None]
+
+            group[2] += r[7]
+            group[3] = r[0]
+
+        for token, group in open_groups.items():
+            close(token, group)
+
+    @staticmethod
+    def _iter_merged(merged):
+        """Iterates over the sorted records of _group_sorted as transfers and removes the temporary files."""
+        with merged:
+            for _, _, _, _, r in merged:
+                transfer = walletscan.TronTransfer()
+                (transfer.timestamp, _, transfer.id, transfer.block, transfer.transaction_hash,
+                 transfer.from_address, transfer.to_address, transfer.amount, transfer.token_name,
+                 transfer.confirmed, transfer.comment) = r
+                yield transfer
+
+    @staticmethod
+    def _date_to_timestamp(date: str):
+        """Converts a date of format "yyyy-mm-dd hh:mm:ss" to a timestamp in milliseconds or None."""
+        if date is None:
+            return None
+        return int(time.mktime(datetime.strptime(date, '%Y-%m-%d %H:%M:%S').timetuple()) * 1000)
+
+    def _load_transfers(self, ts_start: int = None, ts_end: int = None, workers: int = 1, store=None,
+                        max_records: int = None):
+        """Fetches the transfers of the wallet and merges the grouped transfers.
+
+        Without group filters the transfers are streamed, otherwise all transfers are loaded for merging or,
+        with max_records, sorted and merged out of memory.
 
-        print("Fetching transfers from tronscan.org API ...")
-        scanner = walletscan.TronScan(self.wallet_address)
-        transfers = scanner.get_transfers(tokens=self.currency_filters, ts_start=ts_start, ts_end=ts_end)
-        ptr = walletscan.TronTransfer.parse_transfers(transfers)
-        print("Fetching success.")
+        Keyword Arguments:
+            ts_start {int} -- Start timestamp of date range. (default: {None})
+            ts_end {int} -- End timestamp of date range.  (default: {None})
+            workers {int} -- Count of pages which are fetched in parallel. (default: {1})
+            store {TronStore} -- Local store which is synchronized and read instead of fetching the whole
+                                 history. (default: {None})
+            max_records {int} -- Maximum count of transfers in memory while merging. None to merge in memory.
+                                 (default: {None})
+
+        Returns:
+            [TronTransfer] -- Transfers.
+        """
+        scanner = walletscan.TronScan(self.wallet_address, self.transport, self.response_cache)
+
+        if store is not None:
+            print("Synchronizing local store with tronscan.org API ...")
+            store.sync(self.wallet_address, workers=workers, scanner=scanner)
+            ptr = store.get_transfers(self.wallet_address, tokens=self.currency_filters, ts_start=ts_start,
+                                      ts_end=ts_end)
+        else:
+            print("Fetching transfers from tronscan.org API ...")
+            ptr = scanner.iter_transfers(tokens=self.currency_filters, ts_start=ts_start, ts_end=ts_end,
+                                         verbose=True, workers=workers)
+
+        # Merging needs all transfers, without groups the transfers are streamed into the file
+        if self.group_filters and max_records is not None:
+            return self._merge_transfers_external(ptr, max_records)
 
         if self.group_filters:
+            instrumentation = walletscan.get_instrumentation()
+
+            start = time.perf_counter()
+            ptr = walletscan.TransferBatch.from_transfers(ptr)
+            print("Fetching success.")
+
+            self.token_cache.prefetch(t for t in ptr.token_set() if t != '_')
+            instrumentation.on_export_stage('fetch', len(ptr), time.perf_counter() - start)
+
             print("Merging grouped transfers ...")
+            start = time.perf_counter()
+            count = len(ptr)
             ptr = self._merge_transfers(ptr)
+            instrumentation.on_export_stage('group', count, time.perf_counter() - start)
             print("Merging success.")
+        else:
+            ptr = self._prefetch_streamed(ptr)
 
-        print("Writing CSV for CoinTracking.info ...")
-
-        with codecs.open(filename, 'w', 'utf-8') as csvf:
+        return ptr
 
-            # ToDo: Switchable language
-            csvf.write(r'"Typ","Kauf","Cur.","Verkauf","Cur.","Gebühr","Cur.","Börse","Gruppe","Kommentar","Datum"')
+    def _prefetch_streamed(self, transfers):
+        """Fetches the missing token informations of streamed transfers in parallel, chunk by chunk.
 
-            for tr in ptr:
-                line = '\n'
-                has_assign = False
-                tr_type = TransferType.Deposit
-
-                # Type
-                for assign in self.assignments:
-                    if tr.from_address == assign['from_address'] or tr.to_address == assign['to_address']:
-                        tr_type = assign['transfer_type']
-                        has_assign = True
-                        break
+        Arguments:
+            transfers {[TronTransfer]} -- Iterable of transfers.
 
-                if not has_assign:
-                    if tr.to_address == self.wallet_address:
-                        tr_type = TransferType.Deposit
+        Yields:
+            TronTransfer -- Transfer.
+        """
+        transfers = iter(transfers)
+        while True:
+            chunk = list(islice(transfers, self.PREFETCH_CHUNK))
+            if not chunk:
+                return
 
-                    elif tr.from_address == self.wallet_address:
-                        tr_type = TransferType.Withdrawal
+            self.token_cache.prefetch(set(t.token_name for t in chunk if t.token_name != '_'))
+            yield from chunk
 
-                    else:
-                        print('Something went wrong.')
-                        exit()
+    def _iter_rows(self, transfers, exchange: str = None):
+        """Classifies the transfers and converts their amounts for the export.
 
-                line += '\"' + tr_type.value + '\",'
+        Arguments:
+            transfers {[TronTransfer]} -- Transfers.
 
-                amount = 0
-                cur = ''
+        Keyword Arguments:
+            exchange {str} -- Name of the exchange column. (default: {None})
 
-                if tr.token_name == '_':
-                    amount = tr.amount / 1000000
-                    cur = 'TRX'
-                else:
-                    token_info = walletscan.TronScan.get_token_info(tr.token_name)
-                    precision = token_info['data'][0]['precision']
+        Raises:
+            ValueError: A transfer is neither sent nor received by the wallet.
 
-                    amount = tr.amount / (10**precision)
+        Yields:
+            ExportRow -- Row of a transfer.
+        """
+        exchange = '' if exchange is None else exchange
+
+        classifier = self.compile_assignments()
+        formatter = walletscan.DateFormatter.get()
+
+        if isinstance(transfers, list):
+            classified = zip(transfers, classifier.classify_all(transfers),
+                             formatter.format_batch([t.timestamp for t in transfers]))
+        else:
+            classified = ((t, tr_type, formatter.format(t.timestamp))
+                          for t, tr_type in classifier.classify_iter(transfers))
+
+        for tr, tr_type, date in classified:
+            if tr_type is None:
+                raise ValueError("Transfer " + str(tr.id) + " is neither sent nor received by wallet " +
+                                 self.wallet_address)
+
+            if tr.token_name == '_':
+                amount = tr.amount / 1000000
+                cur = 'TRX'
+            else:
+                amount = tr.amount / (10**self.token_cache.get_precision(tr.token_name))
+                cur = self.currency_aliases.get(tr.token_name, tr.token_name)
+
+            yield walletscan.ExportRow(tr, tr_type, amount, cur, classifier.is_incoming(tr_type), exchange, date)
+
+    def export(self, filename: str, start_date: str = None, end_date: str = None, workers: int = 1, store=None,
+               export_format='csv', exchange: str = None, max_records: int = None):
+        """
+        Fetches the transfers from the wallet and exports them to a file.
 
-                    if tr.token_name in self.currency_aliases:
-                        cur = self.currency_aliases[tr.token_name]
-                    else:
-                        cur = tr.token_name
+        Arguments:
+            filename {str} -- Destination file.
+            start_date {str} -- Exports all transfers from including this date. Format: "yyyy-mm-dd hh:mm:ss"
+            end_date {str} -- Exports all transfers up to and including this date. Format: "yyyy-mm-dd hh:mm:ss"
+            workers {int} -- Count of pages which are fetched in parallel. (default: {1})
+            store {TronStore} -- Local store which is synchronized and exported instead of fetching the whole
+                                 history. (default: {None})
+            export_format {str} -- Name of format ('cointracking', 'csv', 'jsonl') or ExportFormat.
+                                   (default: {'csv'})
+            exchange {str} -- Name of the exchange column. (default: {None})
+            max_records {int} -- Maximum count of transfers in memory while merging groups. The sorted transfers
+                                 are spilled to temporary files. None to merge in memory. (default: {None})
 
-                if tr_type.value == TransferType.Deposit.value or \
-                   tr_type.value == TransferType.Revenues.value or \
-                   tr_type.value == TransferType.Mining.value or \
-                   tr_type.value == TransferType.GiftIn.value:
+        Returns:
+            int -- Count of exported transfers.
+        """
+        export_format = walletscan.get_export_format(export_format)
+        ptr = self._load_transfers(self._date_to_timestamp(start_date), self._date_to_timestamp(end_date),
+                                   workers, store, max_records)
 
-                    # Buy
-                    line += '\"' + str(amount) + '\",\"' + cur + '\",'
+        print("Writing " + export_format.DESCRIPTION + " ...")
 
-                    # Sell
-                    line += r'"","",'
+        # Without group filters the transfers are streamed, so the write stage includes fetching
+        start = time.perf_counter()
+        try:
+            with walletscan.ExportWriter(filename, export_format) as writer:
+                count = writer.write_all(self._iter_rows(ptr, exchange))
+        finally:
+            self.token_cache.save()
+        walletscan.get_instrumentation().on_export_stage('write', count, time.perf_counter() - start)
 
-                else:
-                    # Buy
-                    line += r'"","",'
+        print("Writing " + export_format.DESCRIPTION + " finished.")
 
-                    # Sell
-                    line += '\"' + str(amount) + '\",\"' + cur + '\",'
+        return count
 
-                # ToDo: Fee
-                line += r'"","",'
+    def export_csv(self, filename: str, start_date: str = None, end_date: str = None):
+        raise NotImplementedError()
 
-                # Exchange
-                line += '\"' + ('' if self.wallet_name is None else self.wallet_name) + '\",'
 
-                # Group
-                line += r'"",'
+class CoinTrackingExporter(TronTransferExporter):
+    """Exporter class of Tron transfers to a readable file for CoinTracking.info."""
 
-                # Comment
-                line += '\"' + tr.comment + '\",'
+    def __init__(self, wallet_address, wallet_name=None, token_cache=None, transport=None, response_cache=None):
+        super().__init__(wallet_address, token_cache, transport, response_cache)
+        self.wallet_name = wallet_name
 
-                # Date
-                line += '\"' + tr.get_date()
+    def export_csv(self, filename: str, start_date: str = None, end_date: str = None, workers: int = 1,
+                   store=None, max_records: int = None):
+        """
+        Fetches the transfers from the wallet and exports them to a csv file.
 
-                csvf.write(line)
+        Arguments:
+            filename {str} -- Destination file.
+            start_date {str} -- Exports all transfers from including this date. Format: "yyyy-mm-dd hh:mm:ss"
+            end_date {str} -- Exports all transfers up to and including this date. Format: "yyyy-mm-dd hh:mm:ss"
+            workers {int} -- Count of pages which are fetched in parallel. (default: {1})
+            store {TronStore} -- Local store which is synchronized and exported instead of fetching the whole
+                                 history. (default: {None})
+            max_records {int} -- Maximum count of transfers in memory while merging groups. None to merge in
+                                 memory. (default: {None})
+        """
 
-        print('Writing CSV finished.')
+        self.export(filename, start_date, end_date, workers, store, walletscan.CoinTrackingCsvFormat,
+                    self.wallet_name, max_records)
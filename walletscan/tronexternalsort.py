@@ -0,0 +1,134 @@
+import heapq
+import pickle
+import tempfile
+
+
+class ExternalSorter(object):
+    """Sorts more items than fit into memory.
+
+    Added items are buffered. Whenever the buffer reaches the record limit it is sorted and spilled as a run to a
+    temporary file. Iterating merges the runs and the remaining buffer. Runs are written and read in chunks, the
+    chunks of all runs which are merged at once fit into the record limit as well. Items with equal keys keep
+    the order in which they were added.
+    """
+
+    # Maximum count of runs which are merged at once, more runs are merged in several passes
+    MAX_FAN_IN = 64
+
+    # Maximum count of items per pickled chunk of a run
+    CHUNK_SIZE = 1000
+
+    def __init__(self, max_records: int = 100000, key=None, directory: str = None):
+        """
+        Keyword Arguments:
+            max_records {int} -- Maximum count of items in memory. (default: {100000})
+            key {callable} -- Sort key of the items. None for the items themselves. (default: {None})
+            directory {str} -- Directory of the temporary files. None for the system default. (default: {None})
+        """
+        if max_records is None or max_records < 1:
+            raise ValueError("max_records must be at least 1")
+
+        self.max_records = max_records
+        self.key = key
+        self.directory = directory
+        self.count = 0
+        self.chunk_size = max(1, min(self.CHUNK_SIZE, max_records // self.MAX_FAN_IN))
+
+        self._buffer = []
+        self._runs = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @property
+    def run_count(self):
+        """Count of runs which were spilled to temporary files."""
+        return len(self._runs)
+
+    def add(self, item):
+        """Adds an item.
+
+        Arguments:
+            item {object} -- Picklable item.
+        """
+        self._buffer.append(item)
+        self.count += 1
+        if len(self._buffer) >= self.max_records:
+            self._spill()
+
+    def extend(self, items):
+        """Adds items.
+
+        Arguments:
+            items {iterable} -- Picklable items.
+        """
+        for item in items:
+            self.add(item)
+
+    def _write_run(self, items):
+        """Writes sorted items to a new run file."""
+        run = tempfile.TemporaryFile(dir=self.directory)
+        chunk = []
+        for item in items:
+            chunk.append(item)
+            if len(chunk) >= self.chunk_size:
+                pickle.dump(chunk, run, pickle.HIGHEST_PROTOCOL)
+                chunk = []
+        if chunk:
+            pickle.dump(chunk, run, pickle.HIGHEST_PROTOCOL)
+
+        return run
+
+    @staticmethod
+    def _read_run(run):
+        """Iterates over the items of a run file."""
+        run.seek(0)
+        while True:
+            try:
+                chunk = pickle.load(run)
+            except EOFError:
+                return
+            yield from chunk
+
+    def _spill(self):
+        # list.sort is stable, runs are merged in order of creation, so equal keys keep their order
+        self._buffer.sort(key=self.key)
+        self._runs.append(self._write_run(self._buffer))
+        self._buffer = []
+
+    def __iter__(self):
+        """Iterates over all added items in sorted order. Items added afterwards are not included.
+
+        Yields:
+            object -- Item.
+        """
+        if not self._runs:
+            self._buffer.sort(key=self.key)
+            yield from list(self._buffer)
+            return
+
+        if self._buffer:
+            self._spill()
+
+        # Reduces the runs, so at most MAX_FAN_IN runs are open while merging
+        while len(self._runs) > self.MAX_FAN_IN:
+            runs = self._runs
+            self._runs = []
+            for i in range(0, len(runs), self.MAX_FAN_IN):
+                group = runs[i:i + self.MAX_FAN_IN]
+                self._runs.append(self._write_run(
+                    heapq.merge(*[self._read_run(run) for run in group], key=self.key)))
+                for run in group:
+                    run.close()
+
+        yield from heapq.merge(*[self._read_run(run) for run in self._runs], key=self.key)
+
+    def close(self):
+        """Removes the temporary files and the buffered items."""
+        for run in self._runs:
+            run.close()
+        self._runs = []
+        self._buffer = []
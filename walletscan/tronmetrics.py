@@ -0,0 +1,219 @@
+import json
+import threading
+
+
+class Instrumentation(object):
+    """Hooks which are called on the hot paths of scanner, parser and exporter. All hooks do nothing."""
+
+    def on_request(self, path: str, status, seconds: float, size: int):
+        """Called after a request to the api.
+
+        Arguments:
+            path {str} -- Api path.
+            status {int} -- Http status or 'error' for requests which failed with all retries.
+            seconds {float} -- Latency of the request including retries.
+            size {int} -- Size of the response body in bytes.
+        """
+
+    def on_pages(self, path: str, count: int, seconds: float):
+        """Called after all pages of a query are fetched.
+
+        Arguments:
+            path {str} -- Api path.
+            count {int} -- Count of pages.
+            seconds {float} -- Time of fetching the pages.
+        """
+
+    def on_parse(self, kind: str, count: int, seconds: float):
+        """Called after records are parsed.
+
+        Arguments:
+            kind {str} -- Kind of records, 'transfers' or 'transactions'.
+            count {int} -- Count of records.
+            seconds {float} -- Time of parsing.
+        """
+
+    def on_export_stage(self, stage: str, count: int, seconds: float):
+        """Called after a stage of an export.
+
+        Arguments:
+            stage {str} -- Stage of the export, 'fetch', 'group' or 'write'.
+            count {int} -- Count of processed transfers.
+            seconds {float} -- Time of the stage.
+        """
+
+
+class MetricsCollector(Instrumentation):
+    """Instrumentation which aggregates the hook calls to metrics.
+
+    The metrics can be exported as json snapshot or in the Prometheus text format.
+    """
+
+    # Upper bounds of the request latency histogram in seconds
+    LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+    def __init__(self, prefix: str = 'walletscan'):
+        """
+        Keyword Arguments:
+            prefix {str} -- Prefix of the Prometheus metric names. (default: {'walletscan'})
+        """
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Removes all collected metrics."""
+        with self._lock:
+            self._requests = {}
+            self._latency = {}
+            self._pages = {}
+            self._parse = {}
+            self._export = {}
+
+    @staticmethod
+    def _add(metrics: dict, key, count: int, seconds: float, size: int = 0):
+        entry = metrics.get(key)
+        if entry is None:
+            entry = metrics[key] = [0, 0.0, 0]
+        entry[0] += count
+        entry[1] += seconds
+        entry[2] += size
+
+    def on_request(self, path: str, status, seconds: float, size: int):
+        with self._lock:
+            self._add(self._requests, (path, str(status)), 1, seconds, size)
+
+            buckets = self._latency.get(path)
+            if buckets is None:
+                buckets = self._latency[path] = [0] * (len(self.LATENCY_BUCKETS) + 1)
+            for i, bound in enumerate(self.LATENCY_BUCKETS):
+                if seconds <= bound:
+                    buckets[i] += 1
+                    break
+            else:
+                buckets[-1] += 1
+
+    def on_pages(self, path: str, count: int, seconds: float):
+        with self._lock:
+            self._add(self._pages, path, count, seconds)
+
+    def on_parse(self, kind: str, count: int, seconds: float):
+        with self._lock:
+            self._add(self._parse, kind, count, seconds)
+
+    def on_export_stage(self, stage: str, count: int, seconds: float):
+        with self._lock:
+            self._add(self._export, stage, count, seconds)
+
+    def snapshot(self):
+        """Returns the metrics as dict.
+
+        Returns:
+            dict -- Metrics.
+        """
+        with self._lock:
+            requests = [{'path': path, 'status': status, 'count': e[0], 'seconds': e[1], 'bytes': e[2],
+                         'mean_seconds': e[1] / e[0]} for (path, status), e in sorted(self._requests.items())]
+            pages = {path: {'count': e[0], 'seconds': e[1], 'pages_per_second': e[0] / e[1] if e[1] else 0.0}
+                     for path, e in self._pages.items()}
+            parse = {kind: {'count': e[0], 'seconds': e[1], 'records_per_second': e[0] / e[1] if e[1] else 0.0}
+                     for kind, e in self._parse.items()}
+            export = {stage: {'count': e[0], 'seconds': e[1]} for stage, e in self._export.items()}
+            latency = {path: dict(zip([str(b) for b in self.LATENCY_BUCKETS] + ['+Inf'], buckets))
+                       for path, buckets in self._latency.items()}
+
+        return {'requests': requests, 'request_latency_buckets': latency, 'pages': pages, 'parse': parse,
+                'export': export}
+
+    def to_json(self, indent: int = None):
+        """Returns the metrics as json snapshot.
+
+        Keyword Arguments:
+            indent {int} -- Indentation of the json. (default: {None})
+
+        Returns:
+            str -- Json.
+        """
+        return json.dumps(self.snapshot(), indent=indent)
+
+    def to_prometheus(self):
+        """Returns the metrics in the Prometheus text format.
+
+        Returns:
+            str -- Metrics.
+        """
+        lines = []
+
+        def metric(name, metric_type, help_text, samples):
+            name = self.prefix + '_' + name
+            lines.append('# HELP ' + name + ' ' + help_text)
+            lines.append('# TYPE ' + name + ' ' + metric_type)
+            for suffix, labels, value in samples:
+                label_text = ','.join('%s="%s"' % (k, str(v).replace('\\', '\\\\').replace('"', '\\"'))
+                                      for k, v in labels)
+                lines.append(name + suffix + ('{' + label_text + '}' if label_text else '') + ' ' + repr(value))
+
+        with self._lock:
+            requests = sorted(self._requests.items())
+            latency = sorted(self._latency.items())
+            pages = sorted(self._pages.items())
+            parse = sorted(self._parse.items())
+            export = sorted(self._export.items())
+
+        metric('requests_total', 'counter', 'Count of api requests.',
+               [('', [('path', p), ('status', s)], e[0]) for (p, s), e in requests])
+        metric('response_bytes_total', 'counter', 'Size of api responses in bytes.',
+               [('', [('path', p), ('status', s)], e[2]) for (p, s), e in requests])
+
+        samples = []
+        for path, buckets in latency:
+            cumulative = 0
+            for bound, count in zip(self.LATENCY_BUCKETS, buckets):
+                cumulative += count
+                samples.append(('_bucket', [('path', path), ('le', bound)], cumulative))
+            cumulative += buckets[-1]
+            samples.append(('_bucket', [('path', path), ('le', '+Inf')], cumulative))
+            samples.append(('_sum', [('path', path)], sum(e[1] for (p, _), e in requests if p == path)))
+            samples.append(('_count', [('path', path)], cumulative))
+        metric('request_seconds', 'histogram', 'Latency of api requests in seconds.', samples)
+
+        metric('pages_total', 'counter', 'Count of fetched pages.', [('', [('path', p)], e[0]) for p, e in pages])
+        metric('page_fetch_seconds_total', 'counter', 'Time of fetching pages in seconds.',
+               [('', [('path', p)], e[1]) for p, e in pages])
+        metric('parsed_records_total', 'counter', 'Count of parsed records.',
+               [('', [('kind', k)], e[0]) for k, e in parse])
+        metric('parse_seconds_total', 'counter', 'Time of parsing in seconds.',
+               [('', [('kind', k)], e[1]) for k, e in parse])
+        metric('export_records_total', 'counter', 'Count of transfers processed by an export stage.',
+               [('', [('stage', s)], e[0]) for s, e in export])
+        metric('export_seconds_total', 'counter', 'Time of export stages in seconds.',
+               [('', [('stage', s)], e[1]) for s, e in export])
+
+        return '\n'.join(lines) + '\n'
+
+
+_instrumentation = Instrumentation()
+
+
+def get_instrumentation():
+    """Returns the current instrumentation.
+
+    Returns:
+        Instrumentation -- Instrumentation.
+    """
+    return _instrumentation
+
+
+def set_instrumentation(instrumentation: Instrumentation = None):
+    """Sets the instrumentation which receives the hook calls of scanner, parser and exporter.
+
+    Keyword Arguments:
+        instrumentation {Instrumentation} -- Instrumentation. None for no instrumentation. (default: {None})
+
+    Returns:
+        Instrumentation -- Previous instrumentation.
+    """
+    global _instrumentation
+    previous = _instrumentation
+    _instrumentation = instrumentation if instrumentation is not None else Instrumentation()
+    return previous
@@ -0,0 +1,214 @@
+import queue
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from .tronparser import TronTransaction, TronTransfer
+from .tronscanner import TronScan
+
+
+class WalletScanResult(object):
+    """Result of the scan of one wallet."""
+
+    __slots__ = ('wallet_address', 'records', 'error')
+
+    def __init__(self, wallet_address: str, records=None, error: Exception = None):
+        self.wallet_address = wallet_address
+        self.records = records
+        self.error = error
+
+    @property
+    def ok(self):
+        """True, if the wallet was scanned without errors."""
+        return self.error is None
+
+
+class _WalletState(object):
+    """Scan state of one wallet."""
+
+    __slots__ = ('scanner', 'param', 'pages', 'remaining', 'failed')
+
+    def __init__(self, scanner: TronScan):
+        self.scanner = scanner
+        self.param = None
+        self.pages = None
+        self.remaining = 0
+        self.failed = False
+
+
+class MultiWalletScanner(object):
+    """Scans many wallets. The page requests of all wallets share one bounded worker pool."""
+
+    def __init__(self, wallet_addresses: [str], workers: int = 8, rate_limiter=None):
+        """
+        Arguments:
+            wallet_addresses {[str]} -- Addresses of the wallets. Repeated addresses are scanned once.
+
+        Keyword Arguments:
+            workers {int} -- Count of parallel requests of all wallets. (default: {8})
+            rate_limiter {RateLimiter} -- Additional rate limit of the requests of this scanner. The limit of
+                                          TronScan.TRANSPORT applies in any case. (default: {None})
+        """
+        # The state of a scan is kept per address
+        self.wallet_addresses = list(dict.fromkeys(wallet_addresses))
+        self.workers = workers
+        self.rate_limiter = rate_limiter
+
+    def _limited(self, function, *args):
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire()
+        return function(*args)
+
+    def _iter_results(self, path: str, params: dict, parse, ts_start: int, ts_end: int, verbose):
+        """Schedules the requests of all wallets and yields the results of the wallets as they are finished.
+
+        At most two requests per worker are submitted at once. Pages of wallets whose total is known are
+        requested before the totals of further wallets, so the wallets are finished one after another and only
+        the pages of a few unfinished wallets are kept in memory.
+        """
+        executor = ThreadPoolExecutor(max_workers=self.workers)
+        limit = 2 * max(1, self.workers)
+        states = {}
+        tags = {}
+        # Finished futures in order of completion
+        completed = queue.Queue()
+        # Wallets whose total is requested next, and pages of wallets whose total is known
+        totals = deque(self.wallet_addresses)
+        pages = deque()
+
+        def request_records(scanner, param, index):
+            # The entries are converted in the worker thread, only the records of a page are kept
+            return parse(scanner._request_page(path, param, index))
+
+        def submit(address, index, function, *args):
+            future = executor.submit(self._limited, function, *args)
+            tags[future] = (address, index)
+            future.add_done_callback(completed.put)
+
+        def fill():
+            while len(tags) < limit:
+                # Totals are requested ahead while less pages than requests in flight are known
+                if pages and (len(pages) >= limit or not totals):
+                    address, index = pages.popleft()
+                    state = states[address]
+                    submit(address, index, request_records, state.scanner, state.param, index)
+                elif totals:
+                    address = totals.popleft()
+                    state = states[address] = _WalletState(TronScan(address))
+                    submit(address, None, state.scanner._request_total, path, params, ts_start, ts_end)
+                else:
+                    return
+
+        try:
+            fill()
+
+            while tags:
+                future = completed.get()
+                tag = tags.pop(future, None)
+                if tag is None:
+                    # Cancelled after a failure of its wallet
+                    continue
+
+                address, index = tag
+                state = states.get(address)
+                if state is None or state.failed:
+                    fill()
+                    continue
+
+                try:
+                    result = future.result()
+                except Exception as e:
+                    # Failures are isolated, the other wallets are scanned further
+                    state.failed = True
+                    for other, other_tag in list(tags.items()):
+                        if other_tag[0] == address and other.cancel():
+                            del tags[other]
+                    pages = deque(page for page in pages if page[0] != address)
+                    fill()
+                    if verbose:
+                        print("Scan of wallet " + address + " failed: " + str(e))
+                    yield WalletScanResult(address, error=e)
+                    continue
+
+                if index is None:
+                    page_count = TronScan._page_count(result)
+                    state.param = state.scanner._page_param(params, ts_start, ts_end)
+                    state.pages = [None] * page_count
+                    state.remaining = page_count
+                    pages.extend((address, i) for i in range(0, page_count))
+                    fill()
+                    continue
+
+                state.pages[index] = result
+                state.remaining -= 1
+                fill()
+
+                if state.remaining == 0:
+                    records = [r for page in state.pages for r in page]
+                    del states[address]
+                    if verbose:
+                        print("Wallet " + address + ": " + str(len(records)) + " entries received.")
+                    yield WalletScanResult(address, records)
+        finally:
+            for future in tags:
+                future.cancel()
+            executor.shutdown(wait=True)
+
+    def iter_transfers(self, tokens: [str] = None, ts_start: int = None, ts_end: int = None, verbose=False,
+                       keep_data=False):
+        """Scans the transfers of all wallets and yields the result of each wallet as soon as it is finished.
+
+        Keyword Arguments:
+            tokens {[str]} -- List of tokens which will be fetched. None for all tokens. (default: {None})
+            ts_start {int} -- Start timestamp of date range. (default: {None})
+            ts_end {int} -- End timestamp of date range.  (default: {None})
+            verbose {bool} -- Prints process status. (default: {False})
+            keep_data {bool} -- Keeps the data payload of the transfers, otherwise data is None. (default: {False})
+
+        Yields:
+            WalletScanResult -- Result with the TronTransfer objects of a wallet or the error of its scan.
+        """
+        token_set = set(tokens) if tokens else None
+        from_entry = TronTransfer.from_entry
+
+        def parse(page):
+            return [from_entry(d, keep_data) for d in page if token_set is None or d['tokenName'] in token_set]
+
+        return self._iter_results(TronScan.TRANSFER_PATH, TronScan.TRANSFER_PARAMS, parse, ts_start, ts_end,
+                                  verbose)
+
+    def iter_transactions(self, ts_start: int = None, ts_end: int = None, verbose=False, keep_data=False):
+        """Scans the transactions of all wallets and yields the result of each wallet as soon as it is finished.
+
+        Keyword Arguments:
+            ts_start {int} -- Start timestamp of date range. (default: {None})
+            ts_end {int} -- End timestamp of date range.  (default: {None})
+            verbose {bool} -- Prints process status. (default: {False})
+            keep_data {bool} -- Keeps the data payload of the transactions, otherwise data is None.
+                                (default: {False})
+
+        Yields:
+            WalletScanResult -- Result with the TronTransaction objects of a wallet or the error of its scan.
+        """
+        from_entry = TronTransaction.from_entry
+
+        def parse(page):
+            return [from_entry(d, keep_data) for d in page]
+
+        return self._iter_results(TronScan.TRANSACTION_PATH, TronScan.TRANSACTION_PARAMS, parse, ts_start, ts_end,
+                                  verbose)
+
+    def get_transfers(self, tokens: [str] = None, ts_start: int = None, ts_end: int = None, verbose=True,
+                      keep_data=False):
+        """Scans the transfers of all wallets.
+
+        Keyword Arguments:
+            tokens {[str]} -- List of tokens which will be fetched. None for all tokens. (default: {None})
+            ts_start {int} -- Start timestamp of date range. (default: {None})
+            ts_end {int} -- End timestamp of date range.  (default: {None})
+            verbose {bool} -- Prints process status. (default: {True})
+            keep_data {bool} -- Keeps the data payload of the transfers, otherwise data is None. (default: {False})
+
+        Returns:
+            dict -- WalletScanResult of each wallet address.
+        """
+        return {r.wallet_address: r for r in self.iter_transfers(tokens, ts_start, ts_end, verbose, keep_data)}
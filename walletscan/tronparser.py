@@ -1,8 +1,40 @@
 import json
+import math
 import pytz
+import sys
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor
 from enum import Enum 
 from datetime import datetime
 
+from .tronmetrics import get_instrumentation
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def decode_json(content: bytes):
+    """Decodes a json response body without decoding it to a string first. orjson is used if it is installed.
+
+    Arguments:
+        content {bytes} -- Utf-8 encoded json.
+
+    Returns:
+        json -- Decoded json.
+    """
+    if orjson is not None:
+        try:
+            return orjson.loads(content)
+        except orjson.JSONDecodeError:
+            # orjson rejects some documents which json accepts, e.g. integers with more than 64 bits
+            pass
+
+    return json.loads(content)
+
+
 class ContractType(Enum):
         AccountCreate = 0
         Transfer = 1
@@ -14,12 +46,129 @@ class ContractType(Enum):
         Deploy = 7
         WitnessUpdate = 8
         ParticipateAssetIssue = 9
+        AccountUpdate = 10
         Freeze = 11
         Unfreeze = 12
+        WithdrawBalance = 13
+        UnfreezeAsset = 14
+        UpdateAsset = 15
+        ProposalCreate = 16
+        ProposalApprove = 17
+        ProposalDelete = 18
+        SetAccountId = 19
+        Custom = 20
+        CreateSmartContract = 30
+        TriggerSmartContract = 31
+        GetContract = 32
+        UpdateSetting = 33
+        ExchangeCreate = 41
+        ExchangeInject = 42
+        ExchangeWithdraw = 43
+        ExchangeTransaction = 44
+        UpdateEnergyLimit = 45
+        AccountPermissionUpdate = 46
+        ClearABI = 48
+        UpdateBrokerage = 49
+        ShieldedTransfer = 51
+        MarketSellAsset = 52
+        MarketCancelOrder = 53
+        FreezeV2 = 54
+        UnfreezeV2 = 55
+        WithdrawExpireUnfreeze = 56
+        DelegateResource = 57
+        UnDelegateResource = 58
+        CancelAllUnfreezeV2 = 59
+
+class DateFormatter(object):
+    """Formats millisecond timestamps as dates.
+
+    The timezone is looked up once per formatter and formatted dates are cached per second, so repeated
+    timestamps of a batch are only formatted once.
+    """
+
+    DEFAULT_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+    # Maximum count of cached dates per formatter
+    CACHE_SIZE = 65536
+
+    _formatters = {}
+
+    def __init__(self, timezone: str = None, date_format: str = DEFAULT_FORMAT):
+        """
+        Keyword Arguments:
+            timezone {str} -- Timezone. None for the local timezone. (default: {None})
+            date_format {str} -- Format of the date. (default: {'%Y-%m-%d %H:%M:%S'})
+        """
+        self.tz = None if timezone is None else pytz.timezone(timezone)
+        self.date_format = date_format
+        # Formats with fractions of seconds can't share the date of a second
+        self._per_second = '%f' not in date_format
+        self._cache = {}
+
+    @staticmethod
+    def get(timezone: str = None, date_format: str = DEFAULT_FORMAT):
+        """Returns the shared formatter of a timezone and format.
+
+        Keyword Arguments:
+            timezone {str} -- Timezone. None for the local timezone. (default: {None})
+            date_format {str} -- Format of the date. (default: {'%Y-%m-%d %H:%M:%S'})
+
+        Returns:
+            DateFormatter -- Formatter.
+        """
+        key = (timezone, date_format)
+        formatter = DateFormatter._formatters.get(key)
+        if formatter is None:
+            formatter = DateFormatter._formatters.setdefault(key, DateFormatter(timezone, date_format))
+        return formatter
+
+    def format(self, timestamp: int):
+        """Formats a timestamp.
+
+        Arguments:
+            timestamp {int} -- Timestamp in milliseconds.
+
+        Returns:
+            str -- Date.
+        """
+        key = timestamp // 1000 if self._per_second else timestamp
+        date = self._cache.get(key)
+
+        if date is None:
+            date = datetime.fromtimestamp(timestamp / 1000, self.tz).strftime(self.date_format)
+            if len(self._cache) >= self.CACHE_SIZE:
+                self._cache.clear()
+            self._cache[key] = date
+
+        return date
+
+    def format_batch(self, timestamps: [int]):
+        """Formats many timestamps.
+
+        Arguments:
+            timestamps {[int]} -- Timestamps in milliseconds.
+
+        Returns:
+            [str] -- Dates.
+        """
+        cache_get = self._cache.get
+        fmt = self.format
+        per_second = self._per_second
+        dates = []
+
+        for timestamp in timestamps:
+            date = cache_get(timestamp // 1000 if per_second else timestamp)
+            dates.append(date if date is not None else fmt(timestamp))
+
+        return dates
+
 
 class TronTransfer(object):
     """Class of a transfer in the Tron Network."""
 
+    __slots__ = ('id', 'block', 'transaction_hash', 'timestamp', 'from_address', 'to_address', 'amount',
+                 'token_name', 'confirmed', 'data', 'comment')
+
     def __init__(self, transfer_dict = None):
         if transfer_dict is None:
             self.id = None
@@ -48,6 +197,35 @@ class TronTransfer(object):
 
         self.comment = ''
 
+    @staticmethod
+    def from_entry(transfer_dict: dict, keep_data=False):
+        """Creates a transfer from an entry of an api page.
+
+        Arguments:
+            transfer_dict {dict} -- Entry of the api.
+
+        Keyword Arguments:
+            keep_data {bool} -- Keeps the data payload of the transfer, otherwise data is None. (default: {False})
+
+        Returns:
+            TronTransfer -- Transfer.
+        """
+        transfer = object.__new__(TronTransfer)
+        transfer.id = transfer_dict['id']
+        transfer.block = int(transfer_dict['block'])
+        transfer.transaction_hash = transfer_dict['transactionHash']
+        transfer.timestamp = int(transfer_dict['timestamp'])
+        transfer.from_address = transfer_dict['transferFromAddress']
+        transfer.to_address = transfer_dict['transferToAddress']
+        transfer.amount = int(transfer_dict['amount'])
+        transfer.token_name = str(transfer_dict['tokenName'])
+        transfer.confirmed = transfer_dict['confirmed']
+        if not transfer.confirmed:
+            print("Warning: Transfer " + transfer.id + " is not confirmed!")
+        transfer.data = transfer_dict['data'] if keep_data else None
+        transfer.comment = ''
+        return transfer
+
     def get_date(self, timezone = None, date_format = '%Y-%m-%d %H:%M:%S'):
         """Converts the timestamp of transfer in a date.
         
@@ -59,45 +237,321 @@ class TronTransfer(object):
             str -- Date.
         """
 
-        ts = self.timestamp / 1000
-        if timezone is None:
-            dt = datetime.fromtimestamp(ts)
-        else:
-            tz = pytz.timezone(timezone)
-            dt = datetime.fromtimestamp(ts, tz)
-        
-        return dt.strftime(date_format)
+        return DateFormatter.get(timezone, date_format).format(self.timestamp)
 
     @staticmethod
-    def parse_transfers(transfer_dict):
+    def parse_transfers(transfer_dict, as_batch=False):
         """Parse transfers to a list of TronTransfer objects.
         
         Arguments:
             transfer_dict {dict} -- Transfers.
+
+        Keyword Arguments:
+            as_batch {bool} -- Returns a columnar TransferBatch instead of a list. (default: {False})
         
         Returns:
             [TronTransfer] -- List of TronTransfer objects.
         """
 
-        transfers = []
+        start = time.perf_counter()
 
-        for i in range(0, transfer_dict['total']):
-            transfers.append(TronTransfer(transfer_dict['data'][i]))
+        if as_batch:
+            transfers = TransferBatch.from_dict(transfer_dict)
+        else:
+            transfers = []
+
+            for i in range(0, transfer_dict['total']):
+                transfers.append(TronTransfer(transfer_dict['data'][i]))
 
+        get_instrumentation().on_parse('transfers', len(transfers), time.perf_counter() - start)
         return transfers
 
+    @staticmethod
+    def parse_pages(contents: [bytes], workers: int = None, as_batch=False):
+        """Parses the response bodies of transfer pages, optionally in a process pool.
+
+        The pages are decoded and converted in the worker processes, which return the transfers as columnar
+        batches. The data payload of the transfers is not kept.
+
+        Arguments:
+            contents {[bytes]} -- Response bodies of the pages.
+
+        Keyword Arguments:
+            workers {int} -- Count of worker processes. None or 1 parses in this process. (default: {None})
+            as_batch {bool} -- Returns a columnar TransferBatch instead of a list. (default: {False})
+
+        Returns:
+            [TronTransfer] -- List of TronTransfer objects in the order of the pages.
+        """
+        start = time.perf_counter()
+
+        batch = TransferBatch()
+        for chunk in _map_pages(_parse_transfer_pages, contents, workers):
+            batch.extend(chunk)
+        transfers = batch if as_batch else list(batch)
+
+        get_instrumentation().on_parse('transfers', len(transfers), time.perf_counter() - start)
+        return transfers
+
+
+class TransferBatch(object):
+    """Columnar representation of transfers.
+
+    Block, timestamp and amount are kept in arrays and addresses and token names as indices into a table of
+    interned strings. The raw data of the transfers is not kept. Sorting and filtering work on the columns, a
+    TronTransfer object is only created when an entry is accessed.
+    """
+
+    __slots__ = ('ids', 'transaction_hashes', 'blocks', 'timestamps', 'amounts', 'confirmed', 'from_addresses',
+                 'to_addresses', 'token_names', 'comments', 'strings', '_string_index')
+
+    def __init__(self, strings: [str] = None):
+        """
+        Keyword Arguments:
+            strings {[str]} -- String table which is shared with another batch. (default: {None})
+        """
+        self.ids = []
+        self.transaction_hashes = []
+        self.blocks = array('q')
+        self.timestamps = array('q')
+        self.amounts = array('q')
+        self.confirmed = array('b')
+        self.from_addresses = array('l')
+        self.to_addresses = array('l')
+        self.token_names = array('l')
+        self.comments = {}
+        self.strings = strings if strings is not None else []
+        self._string_index = {v: i for i, v in enumerate(self.strings)}
+
+    def _intern(self, value: str):
+        """Returns the index of a string in the string table."""
+        index = self._string_index.get(value)
+        if index is None:
+            index = len(self.strings)
+            self.strings.append(sys.intern(value) if isinstance(value, str) else value)
+            self._string_index[value] = index
+        return index
+
+    def _append(self, tid, block, transaction_hash, timestamp, from_address, to_address, amount, token_name,
+                confirmed):
+        self.ids.append(tid)
+        self.transaction_hashes.append(transaction_hash)
+        self.blocks.append(block if block is not None else -1)
+        self.timestamps.append(timestamp)
+        try:
+            self.amounts.append(amount)
+        except OverflowError:
+            # Amounts of some tokens exceed 64 bit, the column falls back to python ints
+            self.amounts = list(self.amounts)
+            self.amounts.append(amount)
+        self.confirmed.append(1 if confirmed else 0)
+        self.from_addresses.append(self._intern(from_address))
+        self.to_addresses.append(self._intern(to_address))
+        self.token_names.append(self._intern(token_name))
+
+    def append(self, transfer: TronTransfer):
+        """Appends a transfer.
+
+        Arguments:
+            transfer {TronTransfer} -- Transfer.
+        """
+        if transfer.comment:
+            self.comments[len(self.ids)] = transfer.comment
+
+        self._append(transfer.id, transfer.block, transfer.transaction_hash, transfer.timestamp,
+                     transfer.from_address, transfer.to_address, transfer.amount, transfer.token_name,
+                     transfer.confirmed)
+
+    def append_dict(self, transfer_dict: dict):
+        """Appends a transfer as returned by the api.
+
+        Arguments:
+            transfer_dict {dict} -- Transfer.
+        """
+        if not transfer_dict['confirmed']:
+            print("Warning: Transfer " + transfer_dict['id'] + " is not confirmed!")
+
+        self._append(transfer_dict['id'], int(transfer_dict['block']), transfer_dict['transactionHash'],
+                     int(transfer_dict['timestamp']), transfer_dict['transferFromAddress'],
+                     transfer_dict['transferToAddress'], int(transfer_dict['amount']),
+                     str(transfer_dict['tokenName']), transfer_dict['confirmed'])
+
+    @staticmethod
+    def from_transfers(transfers):
+        """Creates a batch from TronTransfer objects.
+
+        Arguments:
+            transfers {[TronTransfer]} -- Transfers.
+
+        Returns:
+            TransferBatch -- Batch of the transfers.
+        """
+        batch = TransferBatch()
+        for t in transfers:
+            batch.append(t)
+        return batch
+
+    @staticmethod
+    def from_dict(transfer_dict):
+        """Creates a batch from transfers as returned by TronScan.get_transfers.
+
+        Arguments:
+            transfer_dict {dict} -- Transfers.
+
+        Returns:
+            TransferBatch -- Batch of the transfers.
+        """
+        batch = TransferBatch()
+        for i in range(0, transfer_dict['total']):
+            batch.append_dict(transfer_dict['data'][i])
+        return batch
+
+    def extend(self, other):
+        """Appends all transfers of another batch.
+
+        Arguments:
+            other {TransferBatch} -- Batch.
+        """
+        offset = len(self.ids)
+        for index, comment in other.comments.items():
+            self.comments[offset + index] = comment
+
+        self.ids.extend(other.ids)
+        self.transaction_hashes.extend(other.transaction_hashes)
+        self.blocks.extend(other.blocks)
+        self.timestamps.extend(other.timestamps)
+        if isinstance(self.amounts, array) and isinstance(other.amounts, array):
+            self.amounts.extend(other.amounts)
+        else:
+            self.amounts = list(self.amounts)
+            self.amounts.extend(other.amounts)
+        self.confirmed.extend(other.confirmed)
+
+        if other.strings is self.strings:
+            self.from_addresses.extend(other.from_addresses)
+            self.to_addresses.extend(other.to_addresses)
+            self.token_names.extend(other.token_names)
+        else:
+            mapping = [self._intern(value) for value in other.strings]
+            self.from_addresses.extend(mapping[i] for i in other.from_addresses)
+            self.to_addresses.extend(mapping[i] for i in other.to_addresses)
+            self.token_names.extend(mapping[i] for i in other.token_names)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __getitem__(self, index: int):
+        if index < 0:
+            index += len(self.ids)
+
+        transfer = TronTransfer()
+        transfer.id = self.ids[index]
+        transfer.block = self.blocks[index] if self.blocks[index] >= 0 else None
+        transfer.transaction_hash = self.transaction_hashes[index]
+        transfer.timestamp = self.timestamps[index]
+        transfer.from_address = self.strings[self.from_addresses[index]]
+        transfer.to_address = self.strings[self.to_addresses[index]]
+        transfer.amount = self.amounts[index]
+        transfer.token_name = self.strings[self.token_names[index]]
+        transfer.confirmed = bool(self.confirmed[index])
+        transfer.comment = self.comments.get(index, '')
+        return transfer
+
+    def __iter__(self):
+        for i in range(0, len(self.ids)):
+            yield self[i]
+
+    def take(self, indices: [int]):
+        """Creates a batch of the entries at the given indices. The string table is shared.
+
+        Arguments:
+            indices {[int]} -- Indices of entries.
+
+        Returns:
+            TransferBatch -- Batch of the entries.
+        """
+        batch = TransferBatch(self.strings)
+        batch._string_index = self._string_index
+        batch.ids = [self.ids[i] for i in indices]
+        batch.transaction_hashes = [self.transaction_hashes[i] for i in indices]
+        batch.blocks = array('q', (self.blocks[i] for i in indices))
+        batch.timestamps = array('q', (self.timestamps[i] for i in indices))
+        if isinstance(self.amounts, array):
+            batch.amounts = array('q', (self.amounts[i] for i in indices))
+        else:
+            batch.amounts = [self.amounts[i] for i in indices]
+        batch.confirmed = array('b', (self.confirmed[i] for i in indices))
+        batch.from_addresses = array('l', (self.from_addresses[i] for i in indices))
+        batch.to_addresses = array('l', (self.to_addresses[i] for i in indices))
+        batch.token_names = array('l', (self.token_names[i] for i in indices))
+
+        if self.comments:
+            for new_index, i in enumerate(indices):
+                if i in self.comments:
+                    batch.comments[new_index] = self.comments[i]
+
+        return batch
+
+    def sort_by_timestamp(self):
+        """Creates a batch sorted by timestamp. Entries with the same timestamp keep their order.
+
+        Returns:
+            TransferBatch -- Sorted batch.
+        """
+        return self.take(sorted(range(0, len(self.ids)), key=self.timestamps.__getitem__))
+
+    def token_set(self):
+        """Returns the distinct token names of the batch.
+
+        Returns:
+            set -- Token names.
+        """
+        return set(self.strings[i] for i in set(self.token_names))
+
+    def filter(self, tokens: [str] = None, ts_start: int = None, ts_end: int = None):
+        """Creates a batch of the entries with the given tokens and within the date range.
+
+        Keyword Arguments:
+            tokens {[str]} -- List of tokens. None for all tokens. (default: {None})
+            ts_start {int} -- Start timestamp of date range. (default: {None})
+            ts_end {int} -- End timestamp of date range.  (default: {None})
+
+        Returns:
+            TransferBatch -- Filtered batch.
+        """
+        indices = range(0, len(self.ids))
+
+        if tokens:
+            token_indices = set(self._string_index[t] for t in tokens if t in self._string_index)
+            token_names = self.token_names
+            indices = [i for i in indices if token_names[i] in token_indices]
+
+        if ts_start is not None:
+            timestamps = self.timestamps
+            indices = [i for i in indices if timestamps[i] >= ts_start]
+
+        if ts_end is not None:
+            timestamps = self.timestamps
+            indices = [i for i in indices if timestamps[i] <= ts_end]
+
+        return self.take(indices)
+
 
 class TronTransaction(object):
     """Class of a transactions in the Tron Network."""
 
+    __slots__ = ('block', 'hash', 'timestamp', 'owner_address', 'contract_type', 'to_address', '_contract_dict',
+                 '_contract_data', 'smart_calls', 'events', 'id', 'confirmed', 'data', 'fee')
+
     def __init__(self, transaction_dict):
         self.block = int(transaction_dict['block'])
         self.hash = transaction_dict['hash']
         self.timestamp = int(transaction_dict['timestamp'])
         self.owner_address = transaction_dict['ownerAddress']
-        self.contract_type = ContractType(transaction_dict['contractType'])
+        self.contract_type = TronContract.parse_type(transaction_dict['contractType'])
         self.to_address = transaction_dict['toAddress']
-        self.contract_data = TronContract(self.contract_type, transaction_dict['contractData'])
+        self._contract_dict = transaction_dict['contractData']
+        self._contract_data = None
         self.smart_calls = transaction_dict['SmartCalls']
         self.events = transaction_dict['Events']
         self.id = transaction_dict['id']
@@ -107,6 +561,72 @@ class TronTransaction(object):
         self.data = transaction_dict['data']
         self.fee = transaction_dict['fee']
 
+    @staticmethod
+    def from_entry(transaction_dict: dict, keep_data=False):
+        """Creates a transaction from an entry of an api page.
+
+        Arguments:
+            transaction_dict {dict} -- Entry of the api.
+
+        Keyword Arguments:
+            keep_data {bool} -- Keeps the data payload of the transaction, otherwise data is None. (default: {False})
+
+        Returns:
+            TronTransaction -- Transaction.
+        """
+        transaction = object.__new__(TronTransaction)
+        transaction.block = int(transaction_dict['block'])
+        transaction.hash = transaction_dict['hash']
+        transaction.timestamp = int(transaction_dict['timestamp'])
+        transaction.owner_address = transaction_dict['ownerAddress']
+        transaction.contract_type = TronContract.parse_type(transaction_dict['contractType'])
+        transaction.to_address = transaction_dict['toAddress']
+        transaction._contract_dict = transaction_dict['contractData']
+        transaction._contract_data = None
+        transaction.smart_calls = transaction_dict['SmartCalls']
+        transaction.events = transaction_dict['Events']
+        transaction.id = transaction_dict['id']
+        transaction.confirmed = transaction_dict['confirmed']
+        if not transaction.confirmed:
+            print("Warning: Transaction " + transaction.id + " is not confirmed!")
+        transaction.data = transaction_dict['data'] if keep_data else None
+        transaction.fee = transaction_dict['fee']
+        return transaction
+
+    @staticmethod
+    def _values(transaction_dict: dict, keep_data=False):
+        """Values of a transaction as tuple, which is passed between processes faster than an object."""
+        if not transaction_dict['confirmed']:
+            print("Warning: Transaction " + transaction_dict['id'] + " is not confirmed!")
+
+        return (int(transaction_dict['block']), transaction_dict['hash'], int(transaction_dict['timestamp']),
+                transaction_dict['ownerAddress'], transaction_dict['contractType'], transaction_dict['toAddress'],
+                transaction_dict['contractData'], transaction_dict['SmartCalls'], transaction_dict['Events'],
+                transaction_dict['id'], transaction_dict['confirmed'],
+                transaction_dict['data'] if keep_data else None, transaction_dict['fee'])
+
+    @staticmethod
+    def _from_values(values: tuple):
+        """Creates a transaction from the values of _values."""
+        transaction = object.__new__(TronTransaction)
+        (transaction.block, transaction.hash, transaction.timestamp, transaction.owner_address, contract_type,
+         transaction.to_address, transaction._contract_dict, transaction.smart_calls, transaction.events,
+         transaction.id, transaction.confirmed, transaction.data, transaction.fee) = values
+        transaction.contract_type = TronContract.parse_type(contract_type)
+        transaction._contract_data = None
+        return transaction
+
+    @property
+    def contract_data(self):
+        """Contract informations of the transaction. They are decoded on first access.
+
+        Returns:
+            TronContract -- Contract informations.
+        """
+        if self._contract_data is None:
+            self._contract_data = TronContract(self.contract_type, self._contract_dict)
+        return self._contract_data
+
     def get_date(self, timezone = None, date_format = '%Y-%m-%d %H:%M:%S'):
         """Converts the timestamp of transaction in a date.
         
@@ -118,14 +638,7 @@ class TronTransaction(object):
             str -- Date.
         """
 
-        ts = self.timestamp / 1000
-        if timezone is None:
-            dt = datetime.fromtimestamp(ts)
-        else:
-            tz = pytz.timezone(timezone)
-            dt = datetime.fromtimestamp(ts, tz)
-        
-        return dt.strftime(date_format)
+        return DateFormatter.get(timezone, date_format).format(self.timestamp)
 
     @staticmethod
     def parse_transactions(transaction_dict):
@@ -138,16 +651,43 @@ class TronTransaction(object):
             [TronTransaction] -- List of TronTransaction objects.
         """
 
+        start = time.perf_counter()
         transaction = []
 
         for i in range(0, transaction_dict['total']):
             transaction.append(TronTransaction(transaction_dict['data'][i]))
 
+        get_instrumentation().on_parse('transactions', len(transaction), time.perf_counter() - start)
         return transaction
-    
+
+    @staticmethod
+    def parse_pages(contents: [bytes], workers: int = None):
+        """Parses the response bodies of transaction pages, optionally in a process pool.
+
+        Arguments:
+            contents {[bytes]} -- Response bodies of the pages.
+
+        Keyword Arguments:
+            workers {int} -- Count of worker processes. None or 1 parses in this process. (default: {None})
+
+        Returns:
+            [TronTransaction] -- List of TronTransaction objects in the order of the pages.
+        """
+        start = time.perf_counter()
+
+        from_values = TronTransaction._from_values
+        transactions = [from_values(v) for chunk in _map_pages(_parse_transaction_pages, contents, workers)
+                        for v in chunk]
+
+        get_instrumentation().on_parse('transactions', len(transactions), time.perf_counter() - start)
+        return transactions
+
+
 class TronVote(object):
     """Class of vote informations."""
 
+    __slots__ = ('vote_address', 'vote_count')
+
     def __init__(self, vote_dict):    
         self.vote_address = vote_dict['vote_address']
         self.vote_count = vote_dict['vote_count']
@@ -171,42 +711,171 @@ class TronVote(object):
         return votes
 
 class TronContract(object):
-    """Contract informations of a transaction."""
+    """Contract informations of a transaction.
+
+    The contract data is decoded by the decoder which is registered for the contract type. Types without a
+    registered decoder keep all fields of the contract data as attributes.
+    """
+
+    DECODERS = {}
 
     def __init__(self, ctype : ContractType, contract_dict):
-        self.owner_address = contract_dict['owner_address']
-
-        # Transfer
-        if ctype == ContractType.Transfer:
-            self.asset_name = '_'
-            self.to_address = contract_dict['to_address']
-            self.amount = int(contract_dict['amount'])
-
-        # TransferAsset
-        elif ctype == ContractType.TransferAsset:
-            self.asset_name = contract_dict['asset_name']
-            self.to_address = contract_dict['to_address']
-            self.amount = int(contract_dict['amount'])
-
-        # Freeze
-        elif ctype == ContractType.Freeze:
-            self.frozen_duration = int(contract_dict['frozen_duration'])
-            self.frozen_balance = int(contract_dict['frozen_balance'])
-
-        # Unfreeze
-        elif ctype == ContractType.Unfreeze:
-            pass
+        self.contract_type = ctype
+        self.owner_address = contract_dict.get('owner_address')
 
-        # VoteWitness
-        elif ctype == ContractType.VoteWitness:
-            self.votes = TronVote.parse_votes(contract_dict['votes'])
+        decoder = TronContract.DECODERS.get(ctype, TronContract.decode_fields)
+        decoder(self, contract_dict)
 
-        # Else
-        else:
-            print(ctype)
-            self.asset_name = contract_dict['asset_name']
-            self.to_address = contract_dict['to_address']
-            self.amount = int(contract_dict['amount'])
-        
-        
-        
+    @staticmethod
+    def parse_type(contract_type: int):
+        """Converts the contract type of the api. Unknown types are kept as int.
+
+        Arguments:
+            contract_type {int} -- Contract type.
+
+        Returns:
+            ContractType -- Contract type.
+        """
+        try:
+            return ContractType(contract_type)
+        except ValueError:
+            return contract_type
+
+    @staticmethod
+    def register(*ctypes: ContractType):
+        """Decorator which registers a decoder function for contract types.
+
+        Arguments:
+            ctypes {ContractType} -- Contract types which are decoded by the function.
+        """
+        def wrapper(decoder):
+            for ctype in ctypes:
+                TronContract.DECODERS[ctype] = decoder
+            return decoder
+        return wrapper
+
+    @staticmethod
+    def decode_fields(contract, contract_dict):
+        """Keeps all fields of the contract data as attributes."""
+        for key, value in contract_dict.items():
+            if key.isidentifier() and key != 'contract_type':
+                setattr(contract, key, value)
+
+        if 'amount' in contract_dict:
+            contract.amount = int(contract_dict['amount'])
+
+
+@TronContract.register(ContractType.Transfer)
+def _decode_transfer(contract, contract_dict):
+    contract.asset_name = '_'
+    contract.to_address = contract_dict['to_address']
+    contract.amount = int(contract_dict['amount'])
+
+
+@TronContract.register(ContractType.TransferAsset, ContractType.ParticipateAssetIssue)
+def _decode_transfer_asset(contract, contract_dict):
+    contract.asset_name = contract_dict['asset_name']
+    contract.to_address = contract_dict['to_address']
+    contract.amount = int(contract_dict['amount'])
+
+
+@TronContract.register(ContractType.Freeze)
+def _decode_freeze(contract, contract_dict):
+    contract.frozen_duration = int(contract_dict['frozen_duration'])
+    contract.frozen_balance = int(contract_dict['frozen_balance'])
+
+
+@TronContract.register(ContractType.Unfreeze)
+def _decode_unfreeze(contract, contract_dict):
+    pass
+
+
+@TronContract.register(ContractType.VoteWitness)
+def _decode_vote_witness(contract, contract_dict):
+    contract.votes = TronVote.parse_votes(contract_dict['votes'])
+
+
+def _parse_transfer_pages(contents: [bytes], tokens=None, ts_start: int = None, ts_end: int = None):
+    """Decodes transfer pages to a TransferBatch. Runs in worker processes.
+
+    Arguments:
+        contents {[bytes]} -- Response bodies of the pages.
+
+    Keyword Arguments:
+        tokens {set} -- Tokens of the kept transfers. None for all tokens. (default: {None})
+        ts_start {int} -- Start timestamp of date range. (default: {None})
+        ts_end {int} -- End timestamp of date range.  (default: {None})
+
+    Returns:
+        TransferBatch -- Transfers.
+    """
+    batch = TransferBatch()
+    for content in contents:
+        for d in decode_json(content)['data']:
+            if tokens is not None and d['tokenName'] not in tokens:
+                continue
+            if (ts_start is not None and int(d['timestamp']) < ts_start) or \
+                    (ts_end is not None and int(d['timestamp']) > ts_end):
+                continue
+            batch.append_dict(d)
+    return batch
+
+
+def _parse_transaction_pages(contents: [bytes], ts_start: int = None, ts_end: int = None, keep_data=False):
+    """Decodes transaction pages to value tuples of TronTransaction._values. Runs in worker processes.
+
+    Arguments:
+        contents {[bytes]} -- Response bodies of the pages.
+
+    Keyword Arguments:
+        ts_start {int} -- Start timestamp of date range. (default: {None})
+        ts_end {int} -- End timestamp of date range.  (default: {None})
+        keep_data {bool} -- Keeps the data payload of the transactions. (default: {False})
+
+    Returns:
+        [tuple] -- Values of the transactions.
+    """
+    values = TronTransaction._values
+    return [values(d, keep_data) for content in contents for d in decode_json(content)['data']
+            if (ts_start is None or int(d['timestamp']) >= ts_start) and
+            (ts_end is None or int(d['timestamp']) <= ts_end)]
+
+
+def _timed_parse(function, contents: [bytes]):
+    """Applies a page parser and measures its time. Runs in worker processes.
+
+    Arguments:
+        function {callable} -- Parser of a list of pages.
+        contents {[bytes]} -- Response bodies of the pages.
+
+    Returns:
+        (object, float) -- Result of the parser and time of parsing in seconds.
+    """
+    start = time.perf_counter()
+    result = function(contents)
+    return result, time.perf_counter() - start
+
+
+def _map_pages(function, contents: [bytes], workers: int = None):
+    """Applies a page parser to chunks of pages, in a process pool with more than one worker.
+
+    Arguments:
+        function {callable} -- Parser of a list of pages.
+        contents {[bytes]} -- Response bodies of the pages.
+
+    Keyword Arguments:
+        workers {int} -- Count of worker processes. (default: {None})
+
+    Returns:
+        list -- Results of the chunks in the order of the pages.
+    """
+    contents = list(contents)
+    if workers is None or workers <= 1 or len(contents) <= 1:
+        return [function(contents)]
+
+    # Several chunks per worker balance the load, larger chunks keep the transfer between processes cheap
+    size = max(1, math.ceil(len(contents) / (workers * 4)))
+    chunks = [contents[i:i + size] for i in range(0, len(contents), size)]
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(function, chunks))
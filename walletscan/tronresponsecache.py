@@ -0,0 +1,162 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from urllib.parse import parse_qsl
+
+from .tronparser import decode_json
+from .trontransport import TronScanError
+
+
+class ResponseCache(object):
+    """On-disk cache of api responses, keyed by api path and request parameters.
+
+    Pages of a closed date range whose entries are all confirmed can not change anymore and never expire. All
+    other responses expire after the ttl. The cache is activated by setting TronScan.RESPONSE_CACHE.
+    """
+
+    RECORD = 'record'
+    REPLAY = 'replay'
+    READ_THROUGH = 'read-through'
+
+    MODES = (RECORD, REPLAY, READ_THROUGH)
+
+    # Age in milliseconds after which blocks are confirmed and the entries before it do not change
+    CONFIRMATION_HORIZON = 5 * 60 * 1000
+
+    def __init__(self, directory: str, mode: str = READ_THROUGH, ttl: float = 3600):
+        """
+        Arguments:
+            directory {str} -- Directory of the cache files.
+
+        Keyword Arguments:
+            mode {str} -- 'record' fetches every response and stores it, 'replay' answers only from the cache
+                          and 'read-through' fetches missing and expired responses. (default: {'read-through'})
+            ttl {float} -- Time in seconds until a mutable response is fetched again. (default: {3600})
+        """
+        if mode not in self.MODES:
+            raise ValueError("Unknown cache mode " + str(mode) + ". Available: " + ', '.join(self.MODES))
+
+        self.directory = directory
+        self.mode = mode
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(directory, exist_ok=True)
+
+    def _filename(self, path: str, params: str):
+        key = hashlib.sha256((path + '?' + (params or '')).encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, key[:2], key + '.json')
+
+    def _count(self, hit: bool):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def is_immutable(self, params: str, data, now: float = None):
+        """Checks whether a response can not change anymore.
+
+        The date range of the query has to end before the confirmation horizon, otherwise new entries shift
+        the pages, and all entries of the response have to be confirmed.
+
+        Arguments:
+            params {str} -- Request parameters.
+            data {dict} -- Decoded response or response body.
+
+        Keyword Arguments:
+            now {float} -- Current time in seconds. (default: {time.time()})
+
+        Returns:
+            bool -- True if the response is immutable.
+        """
+        ts_end = dict(parse_qsl(params or '')).get('end_timestamp')
+        if ts_end is None:
+            return False
+
+        now = time.time() if now is None else now
+        if int(ts_end) > now * 1000 - self.CONFIRMATION_HORIZON:
+            return False
+
+        if isinstance(data, bytes):
+            try:
+                data = decode_json(data)
+            except ValueError:
+                return False
+
+        entries = data.get('data') if isinstance(data, dict) else None
+        if not isinstance(entries, list):
+            return False
+
+        return all(e.get('confirmed', False) for e in entries)
+
+    def get(self, path: str, params: str):
+        """Returns the cached response body of a request.
+
+        Arguments:
+            path {str} -- Api path.
+            params {str} -- Request parameters.
+
+        Raises:
+            TronScanError: The response is missing in replay mode.
+
+        Returns:
+            bytes -- Response body or None if the request has to be sent.
+        """
+        if self.mode == self.RECORD:
+            return None
+
+        try:
+            with open(self._filename(path, params), 'rb') as f:
+                header = json.loads(f.readline())
+                content = f.read()
+        except (OSError, ValueError):
+            header = None
+
+        if header is not None and (self.mode == self.REPLAY or header['immutable'] or
+                                   time.time() - header['time'] < self.ttl):
+            self._count(True)
+            return content
+
+        self._count(False)
+        if self.mode == self.REPLAY:
+            raise TronScanError("Request " + path + "?" + str(params) + " is not in the response cache")
+
+        return None
+
+    def put(self, path: str, params: str, content: bytes, data=None):
+        """Stores a response body.
+
+        Arguments:
+            path {str} -- Api path.
+            params {str} -- Request parameters.
+            content {bytes} -- Response body.
+
+        Keyword Arguments:
+            data {dict} -- Decoded response. None to decode the body when needed. (default: {None})
+        """
+        if self.mode == self.REPLAY:
+            return
+
+        filename = self._filename(path, params)
+        os.makedirs(os.path.dirname(filename), exist_ok=True)
+
+        immutable = self.is_immutable(params, data if data is not None else content)
+        header = {'path': path, 'params': params, 'time': time.time(), 'immutable': immutable}
+
+        tmp_filename = filename + '.' + str(threading.get_ident()) + '.tmp'
+        with open(tmp_filename, 'wb') as f:
+            f.write(json.dumps(header).encode('utf-8') + b'\n')
+            f.write(content)
+        os.replace(tmp_filename, filename)
+
+    def clear(self):
+        """Removes all cached responses."""
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith('.json'):
+                    os.remove(os.path.join(root, name))
@@ -1,6 +1,16 @@
-import json
-import requests
+import functools
+import heapq
+import math
 import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from .tronmetrics import get_instrumentation
+from .tronparser import (TronTransaction, TronTransfer, _parse_transaction_pages, _parse_transfer_pages,
+                         _timed_parse, decode_json)
+from .trontransport import RateLimiter, TronTransport, TronScanError
 
 
 class TronScan(object):
@@ -13,60 +23,323 @@ class TronScan(object):
                        'tstamp_start': 'start_timestamp=',
                        'tstamp_end': 'end_timestamp=',
                        'limit': 'limit=',
-                       'start_index': 'start='}
+                       'start_index': 'start=',
+                       'token': 'token='}
 
     TRANSACTION_PATH = "transaction"
     TRANSACTION_PARAMS = {'address': 'address=',
                           'tstamp_start': 'start_timestamp=',
-                          'tstamp_end': 'end_timestamp',
+                          'tstamp_end': 'end_timestamp=',
                           'limit': 'limit=',
                           'start_index': 'start='}
 
+    # Unique key of the entries of a path, used to remove duplicates in keyset pagination
+    ENTRY_KEYS = {TRANSFER_PATH: 'id', TRANSACTION_PATH: 'hash'}
+
     TOKEN_PATH = "token"
     TOKEN_PARAMS = { 'id' : 'id=' }
     
     PAGE_LIMIT = 50
 
-    def __init__(self, wallet_address: str):
+    # Maximum count of entries of a time window in sharded scans
+    SHARD_LIMIT = 10000
+
+    # Timestamp of the first block of the Tron mainnet
+    GENESIS_TIMESTAMP = 1529891469000
+
+    # Requests per second of all TronScan instances
+    RATE_LIMIT = 10
+
+    # Transport of the scanners without an own transport
+    TRANSPORT = TronTransport(RateLimiter(RATE_LIMIT))
+
+    # ResponseCache of the scanners without an own cache. None for no cache.
+    RESPONSE_CACHE = None
+
+    def __init__(self, wallet_address: str, transport: TronTransport = None, response_cache=None):
+        """
+        Arguments:
+            wallet_address {str} -- Address of wallet.
+
+        Keyword Arguments:
+            transport {TronTransport} -- Transport of the requests of this scanner. (default: {TronScan.TRANSPORT})
+            response_cache {ResponseCache} -- Response cache of this scanner. (default: {TronScan.RESPONSE_CACHE})
+        """
         self.wallet_address = wallet_address
 
-    @staticmethod
-    def __request_api(path: str, req_param: str):
+        # Own transport and cache shadow the ones of the class
+        if transport is not None:
+            self.TRANSPORT = transport
+        if response_cache is not None:
+            self.RESPONSE_CACHE = response_cache
+
+    def __request_content(self, path: str, req_param: str, decode=False):
+        """Sends a request to the tronscan api and returns the undecoded response body.
+
+        Arguments:
+            path {str} -- Api path.
+            req_param {str} -- Request parameters
+
+        Keyword Arguments:
+            decode {bool} -- Returns the decoded response. The response cache reuses it. (default: {False})
+
+        Raises:
+            TronScanError: The request failed with all retries or is missing in a replay-only response cache.
+
+        Returns:
+            bytes -- Response body, or json if decode is set.
+        """
+        start = time.perf_counter()
+        cache = self.RESPONSE_CACHE
+
+        if cache is not None:
+            content = cache.get(path, req_param)
+            if content is not None:
+                get_instrumentation().on_request(path, 'cached', time.perf_counter() - start, len(content))
+                return decode_json(content) if decode else content
+
+        try:
+            response = self.TRANSPORT.get(self.API_URL_BASE + path, req_param)
+        except TronScanError:
+            get_instrumentation().on_request(path, 'error', time.perf_counter() - start, 0)
+            raise
+
+        content = response.content
+        get_instrumentation().on_request(path, response.status_code, time.perf_counter() - start, len(content))
+
+        data = decode_json(content) if decode else None
+
+        if cache is not None:
+            cache.put(path, req_param, content, data)
+
+        return data if decode else content
+
+    def __request_api(self, path: str, req_param: str):
         """Sends a request to the tronscan api.
         
         Arguments:
             path {str} -- Api path.
             req_param {str} -- Request parameters
+
+        Raises:
+            TronScanError: The request failed with all retries or is missing in a replay-only response cache.
         
         Returns:
             json -- Response of request. 
         """
-
-        try:
-            response = requests.get(
-                TronScan.API_URL_BASE + path, params=req_param, timeout=3)
-        except requests.exceptions.Timeout:
-            print("Request " + TronScan.API_URL_BASE + " TIMEOUT!")
-            return None
-
-        if response.status_code == 200:
-            js = json.loads(response.content.decode('utf-8'))
-            return js
-        return None
+        return self.__request_content(path, req_param, True)
 
     @staticmethod
-    def get_token_info(token_id: str):
+    def get_token_info(token_id: str, scanner=None):
         """Request information of token from Tron network.
         
         Arguments:
             token_id {str} -- Id of token.
+
+        Keyword Arguments:
+            scanner {TronScan} -- Scanner whose transport and response cache are used. None for the ones of the
+                                  class. (default: {None})
         
         Returns:
             json -- Token informations.
         """
-        return TronScan.__request_api(TronScan.TOKEN_PATH, TronScan.TOKEN_PARAMS['id'] + token_id)
+        scanner = TronScan(None) if scanner is None else scanner
+        return scanner.__request_api(TronScan.TOKEN_PATH, TronScan.TOKEN_PARAMS['id'] + token_id)
+
+    def _build_param(self, params: dict, limit: int, ts_start: int = None, ts_end: int = None, token: str = None):
+        """Builds the request parameters for a wallet query.
+
+        Arguments:
+            params {dict} -- Parameter names of the api path.
+            limit {int} -- Maximum count of entries per page.
+
+        Keyword Arguments:
+            ts_start {int} -- Start timestamp of date range. (default: {None})
+            ts_end {int} -- End timestamp of date range.  (default: {None})
+            token {str} -- Token of the entries, only for paths with a token parameter. (default: {None})
+
+        Returns:
+            str -- Request parameters.
+        """
+        param = params['address'] + self.wallet_address + '&' + params['limit'] + str(limit)
+
+        if ts_start is not None:
+            param += '&' + params['tstamp_start'] + str(ts_start)
+
+        if ts_end is not None:
+            param += '&' + params['tstamp_end'] + str(ts_end)
+
+        if token is not None:
+            param += '&' + params['token'] + token
+
+        return param
+
+    def _page_param(self, params: dict, ts_start: int = None, ts_end: int = None, token: str = None):
+        """Builds the request parameters for the pages of a wallet query, ending with the start index parameter.
+
+        Arguments:
+            params {dict} -- Parameter names of the api path.
+
+        Keyword Arguments:
+            ts_start {int} -- Start timestamp of date range. (default: {None})
+            ts_end {int} -- End timestamp of date range.  (default: {None})
+            token {str} -- Token of the entries, only for paths with a token parameter. (default: {None})
+
+        Returns:
+            str -- Request parameters.
+        """
+        return self._build_param(params, self.PAGE_LIMIT, ts_start, ts_end, token) + '&' + params['start_index']
+
+    @staticmethod
+    def _page_count(total: int):
+        """Count of pages of a query, without a page at the offset of the total. At least one page is requested.
+
+        Arguments:
+            total {int} -- Total count of entries.
+
+        Returns:
+            int -- Count of pages.
+        """
+        return max(1, math.ceil(total / TronScan.PAGE_LIMIT))
+
+    def _request_page(self, path: str, param: str, index: int):
+        """Requests the entries of a page.
+
+        Arguments:
+            path {str} -- Api path.
+            param {str} -- Request parameters ending with the start index parameter.
+            index {int} -- Index of page.
+
+        Returns:
+            list -- Entries of the page.
+        """
+        return self.__request_api(path, param + str(index * self.PAGE_LIMIT))['data']
+
+    def _request_records(self, path: str, param: str, index: int, parse, ts_start: int = None,
+                         ts_end: int = None):
+        """Requests a page and converts its entries within the date range to records.
+
+        The entries are converted in the thread which requested the page, only the records are kept.
+
+        Arguments:
+            path {str} -- Api path.
+            param {str} -- Request parameters ending with the start index parameter.
+            index {int} -- Index of page.
+            parse {callable} -- Converts a list of entries to a list of records.
+
+        Keyword Arguments:
+            ts_start {int} -- Start timestamp of date range. (default: {None})
+            ts_end {int} -- End timestamp of date range.  (default: {None})
+
+        Returns:
+            list -- Records of the page.
+        """
+        page = self._request_page(path, param, index)
+
+        if ts_start is not None or ts_end is not None:
+            page = [d for d in page if (ts_start is None or int(d['timestamp']) >= ts_start) and
+                    (ts_end is None or int(d['timestamp']) <= ts_end)]
+
+        return parse(page)
+
+    def _iter_pages(self, path: str, param: str, total: int, verbose=True, workers: int = 1, request=None):
+        """Iterates over all pages of a query in offset order.
+
+        Once the total count is known, the offsets of all pages are known as well. With more than one worker
+        the pages are requested in parallel. At most two pages per worker are requested ahead of the page
+        which is yielded next, so the memory usage does not depend on the total count.
+
+        Arguments:
+            path {str} -- Api path.
+            param {str} -- Request parameters ending with the start index parameter.
+            total {int} -- Total count of entries.
+
+        Keyword Arguments:
+            verbose {bool} -- Prints process status. (default: {True})
+            workers {int} -- Count of parallel requests. (default: {1})
+            request {callable} -- Requests a page by path, parameters and index. (default: {self._request_page})
+
+        Yields:
+            list -- Entries of a page.
+        """
+        request = self._request_page if request is None else request
+        page_count = self._page_count(total)
+
+        if verbose:
+            sys.stdout.write("\r0%")
+
+        # Time spent on fetching, without the time the consumer spends on the yielded pages
+        fetched = 0
+        elapsed = 0.0
+
+        if workers is None or workers <= 1:
+            try:
+                for i in range(0, page_count):
+                    start = time.perf_counter()
+                    page = request(path, param, i)
+                    elapsed += time.perf_counter() - start
+                    fetched += 1
+                    if verbose:
+                        sys.stdout.write("\r%d%%" % (((i + 1) / page_count) * 100))
+                    yield page
+            finally:
+                get_instrumentation().on_pages(path, fetched, elapsed)
+            return
+
+        lock = threading.Lock()
+        finished = [0]
+
+        def report(_):
+            with lock:
+                finished[0] += 1
+                sys.stdout.write("\r%d%%" % ((finished[0] / page_count) * 100))
+
+        executor = ThreadPoolExecutor(max_workers=workers)
+        futures = deque()
+        try:
+            next_index = 0
+            for _ in range(0, page_count):
+                while next_index < page_count and len(futures) < 2 * workers:
+                    future = executor.submit(request, path, param, next_index)
+                    if verbose:
+                        future.add_done_callback(report)
+                    futures.append(future)
+                    next_index += 1
+
+                start = time.perf_counter()
+                page = futures.popleft().result()
+                elapsed += time.perf_counter() - start
+                fetched += 1
+                yield page
+        finally:
+            for future in futures:
+                future.cancel()
+            executor.shutdown(wait=True)
+            get_instrumentation().on_pages(path, fetched, elapsed)
+
+    def _fetch_pages(self, path: str, param: str, total: int, verbose=True, workers: int = 1):
+        """Fetches all pages of a query.
+
+        Arguments:
+            path {str} -- Api path.
+            param {str} -- Request parameters ending with the start index parameter.
+            total {int} -- Total count of entries.
+
+        Keyword Arguments:
+            verbose {bool} -- Prints process status. (default: {True})
+            workers {int} -- Count of parallel requests. (default: {1})
+
+        Returns:
+            list -- Entries of all pages.
+        """
+        data = []
+        for page in self._iter_pages(path, param, total, verbose, workers):
+            data.extend(page)
+
+        return data
 
-    def get_transfers(self, tokens: [str] = None, ts_start: int = None, ts_end: int = None, verbose = True):
+    def get_transfers(self, tokens: [str] = None, ts_start: int = None, ts_end: int = None, verbose = True,
+                      workers: int = 1, keyset=False):
         """Fetches the transfers of wallet.
         
         Keyword Arguments:
@@ -74,6 +347,10 @@ class TronScan(object):
             ts_start {int} -- Start timestamp of date range. (default: {None})
             ts_end {int} -- End timestamp of date range.  (default: {None})
             verbose {bool} -- Prints process status. (default: {True})
+            workers {int} -- Count of pages which are fetched in parallel. (default: {1})
+            keyset {bool} -- Pages with timestamp cursors which are pinned at the start of the scan, so new
+                             transfers during the scan neither cause duplicates nor missing transfers. The pages
+                             are requested one after another. (default: {False})
         
         Returns:
             json -- Transfers.
@@ -81,107 +358,643 @@ class TronScan(object):
         if verbose:
             print("Receiving transfers ...")
 
-        param = self.TRANSFER_PARAMS['address'] + \
-        self.wallet_address + '&' + self.TRANSFER_PARAMS['limit'] + '1'
-
-        if ts_start is not None:
-            param += '&' + self.TRANSFER_PARAMS['tstamp_start'] + str(ts_start)
+        if keyset and ts_end is None:
+            ts_end = self._snapshot_timestamp()
 
-        if ts_end is not None:
-            param += '&' + self.TRANSFER_PARAMS['tstamp_end'] + str(ts_end)
+        totals = self._token_totals(tokens, ts_start, ts_end, workers) if tokens else None
+        if totals is not None:
+            return self._fetch_token_transfers(totals, ts_start, ts_end, verbose, workers, keyset)
 
+        param = self._build_param(self.TRANSFER_PARAMS, 1, ts_start, ts_end)
         js = self.__request_api(self.TRANSFER_PATH, param)
         total = js['total']
 
         if verbose:
             print("Total count of transfers to receive: " + str(total))
 
-        max_index = int(total / self.PAGE_LIMIT)
+        if keyset:
+            data = {'total': total, 'data': list(self._iter_keyset(self.TRANSFER_PATH, self.TRANSFER_PARAMS, total,
+                                                                   ts_start, ts_end, verbose))}
+        else:
+            param = self._page_param(self.TRANSFER_PARAMS, ts_start, ts_end)
+            data = {'total': total, 'data': self._fetch_pages(self.TRANSFER_PATH, param, total, verbose, workers)}
 
-        param = self.TRANSFER_PARAMS['address'] + self.wallet_address + '&' + \
-            self.TRANSFER_PARAMS['limit'] + str(self.PAGE_LIMIT)
+        if verbose:
+            print('\n' + str(len(data['data'])) + ' transfers received.')
 
-        if ts_start is not None:
-            param += '&' + self.TRANSFER_PARAMS['tstamp_start'] + str(ts_start)
+        if tokens:
+            token_set = set(tokens)
+            data['data'] = [d for d in data['data'] if d['tokenName'] in token_set]
 
-        if ts_end is not None:
-            param += '&' + self.TRANSFER_PARAMS['tstamp_end'] + str(ts_end)
+        data['total'] = len(data['data'])
 
-        param += '&' + self.TRANSFER_PARAMS['start_index']
+        return data
 
-        data = {'total': total, 'data': []}
+    def _token_totals(self, tokens: [str], ts_start: int = None, ts_end: int = None, workers: int = 1):
+        """Requests the total count of transfers of each token with token filtered queries.
 
-        if verbose:
-            sys.stdout.write("\r0%")
+        Arguments:
+            tokens {[str]} -- Tokens.
 
-        for i in range(0, max_index + 1):
-            js = self.__request_api(
-                self.TRANSFER_PATH, param + str(i * self.PAGE_LIMIT))
-            data['data'].extend(js['data'])
-            progress = ((i + 1) / (max_index + 1)) * 100
-            if verbose:
-                sys.stdout.write("\r%d%%" % progress)
+        Keyword Arguments:
+            ts_start {int} -- Start timestamp of date range. (default: {None})
+            ts_end {int} -- End timestamp of date range.  (default: {None})
+            workers {int} -- Count of parallel requests. (default: {1})
+
+        Returns:
+            dict -- Total count of each token or None if the api ignores the token filter.
+        """
+        tokens = list(dict.fromkeys(tokens))
+
+        def request(token):
+            return self.__request_api(self.TRANSFER_PATH,
+                                      self._build_param(self.TRANSFER_PARAMS, 1, ts_start, ts_end, token))
+
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(tokens)))) as executor:
+            responses = list(executor.map(request, tokens))
+
+        totals = {}
+        for token, js in zip(tokens, responses):
+            if any(d['tokenName'] != token for d in js['data']):
+                return None
+            totals[token] = js['total']
+
+        return totals
+
+    @staticmethod
+    def _token_workers(workers: int, token_count: int):
+        """Splits the workers among the queries of several tokens."""
+        return max(1, (workers or 1) // max(1, token_count))
+
+    def _fetch_token_transfers(self, totals: dict, ts_start: int = None, ts_end: int = None, verbose=True,
+                               workers: int = 1, keyset=False):
+        """Fetches the transfers of several tokens with one query per token and merges them by timestamp.
+
+        Arguments:
+            totals {dict} -- Total count of transfers of each token.
+
+        Keyword Arguments:
+            ts_start {int} -- Start timestamp of date range. (default: {None})
+            ts_end {int} -- End timestamp of date range.  (default: {None})
+            verbose {bool} -- Prints process status. (default: {True})
+            workers {int} -- Count of pages which are fetched in parallel. (default: {1})
+            keyset {bool} -- Pages with timestamp cursors. (default: {False})
+
+        Returns:
+            json -- Transfers, newest first.
+        """
+        tokens = [t for t, total in totals.items() if total > 0]
 
         if verbose:
-            print('\n' + str(len(data['data'])) + ' transfers received.')
+            print("Total count of transfers to receive: " + str(sum(totals.values())) + " of " +
+                  str(len(totals)) + " tokens")
 
-        if tokens:
-            new_data = []
-            for d in data['data']:
-                if d['tokenName'] in tokens:
-                    new_data.append(d)
+        token_workers = self._token_workers(workers, len(tokens))
 
-            data['data'] = new_data
+        def fetch(token):
+            if keyset:
+                return list(self._iter_keyset(self.TRANSFER_PATH, self.TRANSFER_PARAMS, totals[token], ts_start,
+                                              ts_end, token=token))
 
-        data['total'] = len(data['data'])
+            param = self._page_param(self.TRANSFER_PARAMS, ts_start, ts_end, token)
+            return self._fetch_pages(self.TRANSFER_PATH, param, totals[token], False, token_workers)
 
-        return data
+        with ThreadPoolExecutor(max_workers=max(1, len(tokens))) as executor:
+            pages = list(executor.map(fetch, tokens))
+
+        # Set based filtering remains, in case the api ignores the filter for a query
+        token_set = set(totals)
+        data = [d for d in heapq.merge(*pages, key=lambda d: -int(d['timestamp'])) if d['tokenName'] in token_set]
+
+        if verbose:
+            print(str(len(data)) + ' transfers received.')
 
-    def get_all_transactions(self, ts_start: int = None, ts_end: int = None):
+        return {'total': len(data), 'data': data}
+
+    def get_all_transactions(self, ts_start: int = None, ts_end: int = None, workers: int = 1, keyset=False):
         """Fetches all transactions of wallet.
         
         Keyword Arguments:
             ts_start {int} -- Start timestamp of date range. (default: {None})
             ts_end {int} -- End timestamp of date range.  (default: {None})
+            workers {int} -- Count of pages which are fetched in parallel. (default: {1})
+            keyset {bool} -- Pages with timestamp cursors which are pinned at the start of the scan, so new
+                             transactions during the scan neither cause duplicates nor missing transactions. The
+                             pages are requested one after another. (default: {False})
         
         Returns:
             json -- Transactions.
         """
-        param = self.TRANSACTION_PARAMS['address'] + \
-            self.wallet_address + '&' + self.TRANSACTION_PARAMS['limit'] + '1'
-
-        if ts_start is not None:
-            param += '&' + self.TRANSACTION_PARAMS['tstamp_start'] + str(ts_start)
-
-        if ts_end is not None:
-            param += '&' + self.TRANSACTION_PARAMS['tstamp_end'] + str(ts_end)
+        if keyset and ts_end is None:
+            ts_end = self._snapshot_timestamp()
 
+        param = self._build_param(self.TRANSACTION_PARAMS, 1, ts_start, ts_end)
         js = self.__request_api(self.TRANSACTION_PATH, param)
         total = js['total']
         print("Total count of transcations to receive: " + str(total))
 
-        max_index = int(total / self.PAGE_LIMIT)
-        param = self.TRANSACTION_PARAMS['address'] + self.wallet_address + '&' + \
-            self.TRANSACTION_PARAMS['limit'] + str(self.PAGE_LIMIT)
-
-        if ts_start is not None:
-            param += '&' + self.TRANSACTION_PARAMS['tstamp_start'] + str(ts_start)
-
-        if ts_end is not None:
-            param += '&' + self.TRANSACTION_PARAMS['tstamp_end'] + str(ts_end)
-        
-        param += '&' + self.TRANSACTION_PARAMS['start_index']
-
-        data = {'total': total, 'data': []}
-        sys.stdout.write("\r0%")
-        for i in range(0, max_index + 1):
-            js = self.__request_api(
-                self.TRANSACTION_PATH, param + str(i * self.PAGE_LIMIT))
-            data['data'].extend(js['data'])
-            progress = ((i + 1) / (max_index + 1)) * 100
-            sys.stdout.write("\r%d%%" % progress)
+        if keyset:
+            data = {'total': total, 'data': list(self._iter_keyset(self.TRANSACTION_PATH, self.TRANSACTION_PARAMS,
+                                                                   total, ts_start, ts_end, True))}
+        else:
+            param = self._page_param(self.TRANSACTION_PARAMS, ts_start, ts_end)
+            data = {'total': total, 'data': self._fetch_pages(self.TRANSACTION_PATH, param, total, True, workers)}
 
         data_len = len(data['data'])
         data['total'] = data_len
         print('\n' + str(data_len) + ' transcations received.')
         return data
+
+    def _shard_windows(self, executor, path: str, params: dict, ts_start: int, ts_end: int, max_total: int):
+        """Splits a date range into time windows with at most max_total entries.
+
+        The total count of every window is probed with limit=1. Windows with too many entries are split into as
+        many equal parts as their total count requires, until all windows are small enough or only one
+        millisecond long.
+
+        Returns:
+            [(int, int, int)] -- Start timestamp, end timestamp and total count of the windows.
+        """
+        windows = []
+        pending = [(ts_start, ts_end)]
+
+        while pending:
+            totals = executor.map(lambda w: self._request_total(path, params, w[0], w[1]), pending)
+            next_pending = []
+
+            for (start, end), total in zip(pending, totals):
+                if total == 0:
+                    continue
+
+                if total <= max_total or start >= end:
+                    windows.append((start, end, total))
+                    continue
+
+                parts = min(math.ceil(total / max_total) + 1, end - start + 1)
+                width = (end - start + 1) / parts
+                bounds = [start + int(i * width) for i in range(0, parts)] + [end + 1]
+                for i in range(0, parts):
+                    next_pending.append((bounds[i], bounds[i + 1] - 1))
+
+            pending = next_pending
+
+        return windows
+
+    def _fetch_sharded(self, path: str, params: dict, key: str, ts_start: int = None, ts_end: int = None,
+                       max_total: int = None, verbose=True, workers: int = 4):
+        """Fetches the entries of a date range window by window.
+
+        Arguments:
+            path {str} -- Api path.
+            params {dict} -- Parameter names of the api path.
+            key {str} -- Unique key of an entry.
+
+        Keyword Arguments:
+            ts_start {int} -- Start timestamp of date range. None for the first block. (default: {None})
+            ts_end {int} -- End timestamp of date range. None for now. (default: {None})
+            max_total {int} -- Maximum count of entries of a window. (default: {SHARD_LIMIT})
+            verbose {bool} -- Prints process status. (default: {True})
+            workers {int} -- Count of parallel requests. (default: {4})
+
+        Returns:
+            list -- Entries without duplicates, newest first.
+        """
+        ts_start = self.GENESIS_TIMESTAMP if ts_start is None else ts_start
+        ts_end = int(time.time() * 1000) if ts_end is None else ts_end
+        max_total = self.SHARD_LIMIT if max_total is None else max_total
+
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            windows = self._shard_windows(executor, path, params, ts_start, ts_end, max_total)
+            windows.sort(reverse=True)
+
+            if verbose:
+                print("Total count to receive: " + str(sum(w[2] for w in windows)) + " in " + str(len(windows)) +
+                      " time windows")
+
+            jobs = []
+            for w, (start, end, total) in enumerate(windows):
+                param = self._page_param(params, start, end)
+                for i in range(0, self._page_count(total)):
+                    jobs.append((w, i, executor.submit(self._request_page, path, param, i)))
+
+            if verbose:
+                sys.stdout.write("\r0%")
+
+            data = []
+            seen = set()
+            for done, (w, i, future) in enumerate(jobs, 1):
+                for d in future.result():
+                    if d[key] not in seen:
+                        seen.add(d[key])
+                        data.append(d)
+
+                if verbose:
+                    sys.stdout.write("\r%d%%" % ((done / len(jobs)) * 100))
+
+        if verbose:
+            print('')
+
+        return data
+
+    def get_transfers_sharded(self, tokens: [str] = None, ts_start: int = None, ts_end: int = None,
+                              max_window_total: int = None, verbose=True, workers: int = 4):
+        """Fetches the transfers of wallet in time windows instead of deep offset pages.
+
+        The date range is split into time windows with at most max_window_total transfers. The windows are
+        fetched in parallel and merged without duplicates.
+
+        Keyword Arguments:
+            tokens {[str]} -- List of tokens which will be fetched. None for all tokens. (default: {None})
+            ts_start {int} -- Start timestamp of date range. None for the first block. (default: {None})
+            ts_end {int} -- End timestamp of date range. None for now. (default: {None})
+            max_window_total {int} -- Maximum count of transfers of a window. (default: {SHARD_LIMIT})
+            verbose {bool} -- Prints process status. (default: {True})
+            workers {int} -- Count of parallel requests. (default: {4})
+
+        Returns:
+            json -- Transfers.
+        """
+        if verbose:
+            print("Receiving transfers ...")
+
+        data = self._fetch_sharded(self.TRANSFER_PATH, self.TRANSFER_PARAMS, 'id', ts_start, ts_end,
+                                   max_window_total, verbose, workers)
+
+        if verbose:
+            print(str(len(data)) + ' transfers received.')
+
+        if tokens:
+            token_set = set(tokens)
+            data = [d for d in data if d['tokenName'] in token_set]
+
+        return {'total': len(data), 'data': data}
+
+    def get_transactions_sharded(self, ts_start: int = None, ts_end: int = None, max_window_total: int = None,
+                                 verbose=True, workers: int = 4):
+        """Fetches the transactions of wallet in time windows instead of deep offset pages.
+
+        Keyword Arguments:
+            ts_start {int} -- Start timestamp of date range. None for the first block. (default: {None})
+            ts_end {int} -- End timestamp of date range. None for now. (default: {None})
+            max_window_total {int} -- Maximum count of transactions of a window. (default: {SHARD_LIMIT})
+            verbose {bool} -- Prints process status. (default: {True})
+            workers {int} -- Count of parallel requests. (default: {4})
+
+        Returns:
+            json -- Transactions.
+        """
+        data = self._fetch_sharded(self.TRANSACTION_PATH, self.TRANSACTION_PARAMS, 'hash', ts_start, ts_end,
+                                   max_window_total, verbose, workers)
+
+        if verbose:
+            print(str(len(data)) + ' transcations received.')
+
+        return {'total': len(data), 'data': data}
+
+    def _request_total(self, path: str, params: dict, ts_start: int = None, ts_end: int = None, token: str = None):
+        """Requests the total count of entries of a wallet query.
+
+        Arguments:
+            path {str} -- Api path.
+            params {dict} -- Parameter names of the api path.
+
+        Keyword Arguments:
+            ts_start {int} -- Start timestamp of date range. (default: {None})
+            ts_end {int} -- End timestamp of date range.  (default: {None})
+            token {str} -- Token of the entries, only for paths with a token parameter. (default: {None})
+
+        Returns:
+            int -- Total count of entries.
+        """
+        return self.__request_api(path, self._build_param(params, 1, ts_start, ts_end, token))['total']
+
+    def _iter_entries(self, path: str, params: dict, total: int, ts_start: int = None, ts_end: int = None,
+                      verbose=False, workers: int = 1, parse=None, token: str = None, keyset=False):
+        """Iterates over the entries of a wallet query within the date range.
+
+        Arguments:
+            path {str} -- Api path.
+            params {dict} -- Parameter names of the api path.
+            total {int} -- Total count of entries.
+
+        Keyword Arguments:
+            ts_start {int} -- Start timestamp of date range. (default: {None})
+            ts_end {int} -- End timestamp of date range.  (default: {None})
+            verbose {bool} -- Prints process status. (default: {False})
+            workers {int} -- Count of pages which are fetched in parallel. (default: {1})
+            parse {callable} -- Converts the entries of a page to records in the fetching thread. None for the
+                                entries as returned by the api. (default: {None})
+            token {str} -- Token of the entries, only for paths with a token parameter. (default: {None})
+            keyset {bool} -- Pages with timestamp cursors instead of offsets, see _iter_keyset. (default: {False})
+
+        Yields:
+            dict -- Entry as returned by the api or record.
+        """
+        if keyset:
+            yield from self._iter_keyset(path, params, total, ts_start, ts_end, verbose, parse, token)
+            return
+
+        param = self._page_param(params, ts_start, ts_end, token)
+        request = functools.partial(self._request_records, parse=parse if parse is not None else list,
+                                    ts_start=ts_start, ts_end=ts_end)
+
+        for page in self._iter_pages(path, param, total, verbose, workers, request):
+            yield from page
+
+    def _iter_parsed(self, path: str, params: dict, total: int, ts_start: int, ts_end: int, verbose, workers: int,
+                     processes, parse_workers: int, parse, kind: str, token: str = None):
+        """Iterates over the pages of a wallet query which are parsed in a process pool.
+
+        The threads request the undecoded pages and hand them to the process pool, so decoding runs on other
+        cores while the next pages are requested. The results are yielded in page order.
+
+        Arguments:
+            path {str} -- Api path.
+            params {dict} -- Parameter names of the api path.
+            total {int} -- Total count of entries.
+            ts_start {int} -- Start timestamp of date range.
+            ts_end {int} -- End timestamp of date range.
+            verbose {bool} -- Prints process status.
+            workers {int} -- Count of pages which are fetched in parallel.
+            processes {ProcessPoolExecutor} -- Process pool.
+            parse_workers {int} -- Count of processes of the pool.
+            parse {callable} -- Picklable parser of a list of response bodies.
+            kind {str} -- Kind of records for the parse metrics, 'transfers' or 'transactions'.
+
+        Keyword Arguments:
+            token {str} -- Token of the entries, only for paths with a token parameter. (default: {None})
+
+        Yields:
+            object -- Result of the parser for a page.
+        """
+        param = self._page_param(params, ts_start, ts_end, token)
+        instrumentation = get_instrumentation()
+
+        def request(path, param, index):
+            content = self.__request_content(path, param + str(index * self.PAGE_LIMIT))
+            return processes.submit(_timed_parse, parse, [content])
+
+        def result(future):
+            records, seconds = future.result()
+            instrumentation.on_parse(kind, len(records), seconds)
+            return records
+
+        # Up to one page per process is parsed while the next pages are requested
+        pending = deque()
+        try:
+            for future in self._iter_pages(path, param, total, verbose, workers, request):
+                pending.append(future)
+                if len(pending) > parse_workers:
+                    yield result(pending.popleft())
+
+            while pending:
+                yield result(pending.popleft())
+        finally:
+            for future in pending:
+                future.cancel()
+
+    @staticmethod
+    def _parse_pool(parse_workers: int, keep_data: bool, keyset: bool):
+        """Creates the process pool of a scan with parse workers or returns None.
+
+        Raises:
+            ValueError: Parse workers are combined with keep_data or keyset.
+        """
+        if parse_workers is None or parse_workers <= 1:
+            return None
+
+        if keep_data:
+            raise ValueError("The data payload is not kept with parse workers")
+        if keyset:
+            raise ValueError("Keyset pagination decodes every page before the next request, parse workers are "
+                             "not available")
+
+        return ProcessPoolExecutor(max_workers=parse_workers)
+
+    @staticmethod
+    def _snapshot_timestamp():
+        """Current time in milliseconds, the upper bound of a scan which is pinned at its start."""
+        return int(time.time() * 1000)
+
+    def _iter_keyset(self, path: str, params: dict, total: int, ts_start: int = None, ts_end: int = None,
+                     verbose=False, parse=None, token: str = None):
+        """Iterates over the entries of a wallet query with timestamp cursors.
+
+        The scan is pinned to the end timestamp, or to the current time at its start, so new entries do not
+        shift the pages. Every page is requested with the timestamp of the oldest received entry as end
+        timestamp and an offset which only skips the received entries of that timestamp. Entries which are
+        received twice at a page boundary are removed by their id or hash. The pages are requested one after
+        another, because each cursor depends on the previous page.
+
+        Arguments:
+            path {str} -- Api path.
+            params {dict} -- Parameter names of the api path.
+            total {int} -- Total count of entries up to the end timestamp, used for the completeness check.
+
+        Keyword Arguments:
+            ts_start {int} -- Start timestamp of date range. (default: {None})
+            ts_end {int} -- End timestamp of date range. None for the current time. (default: {None})
+            verbose {bool} -- Prints process status. (default: {False})
+            parse {callable} -- Converts the entries of a page to records. None for the entries as returned by
+                                the api. (default: {None})
+            token {str} -- Token of the entries, only for paths with a token parameter. (default: {None})
+
+        Yields:
+            dict -- Entry as returned by the api or record.
+        """
+        key = self.ENTRY_KEYS[path]
+        parse = parse if parse is not None else list
+        cursor = ts_end if ts_end is not None else self._snapshot_timestamp()
+
+        # Offset of the next page within the entries of the cursor timestamp and the keys of these entries
+        offset = 0
+        seen = set()
+        count = 0
+        fetched = 0
+        elapsed = 0.0
+
+        if verbose:
+            sys.stdout.write("\r0%")
+
+        try:
+            while True:
+                start = time.perf_counter()
+                page = self.__request_api(path, self._page_param(params, ts_start, cursor, token) +
+                                          str(offset))['data']
+                elapsed += time.perf_counter() - start
+                fetched += 1
+
+                if not page:
+                    break
+
+                entries = [d for d in page if d[key] not in seen and
+                           (ts_start is None or int(d['timestamp']) >= ts_start)]
+
+                last = int(page[-1]['timestamp'])
+                if last == cursor:
+                    offset += len(page)
+                else:
+                    cursor = last
+                    seen = set()
+                    offset = sum(1 for d in page if int(d['timestamp']) == last)
+                seen.update(d[key] for d in page if int(d['timestamp']) == cursor)
+
+                count += len(entries)
+                if verbose:
+                    sys.stdout.write("\r%d%%" % ((count / total if total else 1) * 100))
+
+                yield from parse(entries)
+
+                if len(page) < self.PAGE_LIMIT:
+                    break
+        finally:
+            get_instrumentation().on_pages(path, fetched, elapsed)
+
+        if count != total:
+            print("\nWarning: " + str(count) + " of " + str(total) + " entries of " + path + " received!")
+
+    def iter_transfers(self, tokens: [str] = None, ts_start: int = None, ts_end: int = None, verbose=False,
+                       workers: int = 1, keep_data=False, keyset=False, parse_workers: int = None):
+        """Iterates over the transfers of wallet page by page.
+
+        At most two pages per worker, and one more page per parse worker, are requested ahead of the page which
+        is yielded, so the memory usage does not grow with the size of the wallet history.
+
+        Keyword Arguments:
+            tokens {[str]} -- List of tokens which will be fetched. None for all tokens. (default: {None})
+            ts_start {int} -- Start timestamp of date range. (default: {None})
+            ts_end {int} -- End timestamp of date range.  (default: {None})
+            verbose {bool} -- Prints process status. (default: {False})
+            workers {int} -- Count of pages which are fetched in parallel. (default: {1})
+            keep_data {bool} -- Keeps the data payload of the transfers, otherwise data is None. (default: {False})
+            keyset {bool} -- Pages with timestamp cursors which are pinned at the start of the scan, so new
+                             transfers during the scan neither cause duplicates nor missing transfers. The pages
+                             are requested one after another. (default: {False})
+            parse_workers {int} -- Count of processes which decode the pages while the next pages are requested.
+                                   None parses in the requesting threads. Not available with keep_data and
+                                   keyset. (default: {None})
+
+        Yields:
+            TronTransfer -- Transfer.
+        """
+        processes = None
+
+        try:
+            processes = self._parse_pool(parse_workers, keep_data, keyset)
+
+            if verbose:
+                print("Receiving transfers ...")
+
+            if keyset and ts_end is None:
+                ts_end = self._snapshot_timestamp()
+
+            token_set = set(tokens) if tokens else None
+            totals = self._token_totals(tokens, ts_start, ts_end, workers) if tokens else None
+            from_entry = TronTransfer.from_entry
+
+            def parse(page):
+                start = time.perf_counter()
+                transfers = [from_entry(d, keep_data) for d in page if token_set is None or d['tokenName'] in token_set]
+                get_instrumentation().on_parse('transfers', len(transfers), time.perf_counter() - start)
+                return transfers
+
+            def stream(stream_total, stream_verbose, stream_workers, token=None):
+                if processes is None:
+                    return self._iter_entries(self.TRANSFER_PATH, self.TRANSFER_PARAMS, stream_total, ts_start, ts_end,
+                                              stream_verbose, stream_workers, parse, token, keyset)
+
+                batches = self._iter_parsed(self.TRANSFER_PATH, self.TRANSFER_PARAMS, stream_total, ts_start, ts_end,
+                                            stream_verbose, stream_workers, processes, parse_workers,
+                                            functools.partial(_parse_transfer_pages, tokens=token_set,
+                                                              ts_start=ts_start, ts_end=ts_end), 'transfers', token)
+                return (t for batch in batches for t in batch)
+
+            if totals is None:
+                total = self._request_total(self.TRANSFER_PATH, self.TRANSFER_PARAMS, ts_start, ts_end)
+                transfers = stream(total, verbose, workers)
+            else:
+                # One query per token, the streams are fetched concurrently and merged newest first
+                total = sum(totals.values())
+                tokens = [t for t, token_total in totals.items() if token_total > 0]
+                token_workers = self._token_workers(workers, len(tokens))
+                transfers = heapq.merge(*[stream(totals[t], False, token_workers, t) for t in tokens],
+                                        key=lambda t: -t.timestamp)
+
+            if verbose:
+                print("Total count of transfers to receive: " + str(total))
+
+            count = 0
+
+            for transfer in transfers:
+                count += 1
+                yield transfer
+        finally:
+            if processes is not None:
+                processes.shutdown(wait=True, cancel_futures=True)
+
+        if verbose:
+            print('\n' + str(count) + ' transfers received.')
+
+    def iter_transactions(self, ts_start: int = None, ts_end: int = None, verbose=False, workers: int = 1,
+                          keep_data=False, keyset=False, parse_workers: int = None):
+        """Iterates over the transactions of wallet page by page.
+
+        Keyword Arguments:
+            ts_start {int} -- Start timestamp of date range. (default: {None})
+            ts_end {int} -- End timestamp of date range.  (default: {None})
+            verbose {bool} -- Prints process status. (default: {False})
+            workers {int} -- Count of pages which are fetched in parallel. (default: {1})
+            keep_data {bool} -- Keeps the data payload of the transactions, otherwise data is None.
+                                (default: {False})
+            keyset {bool} -- Pages with timestamp cursors which are pinned at the start of the scan. The pages are
+                             requested one after another. (default: {False})
+            parse_workers {int} -- Count of processes which decode the pages while the next pages are requested.
+                                   None parses in the requesting threads. Not available with keyset.
+                                   (default: {None})
+
+        Yields:
+            TronTransaction -- Transaction.
+        """
+        processes = None
+
+        try:
+            processes = self._parse_pool(parse_workers, False, keyset)
+
+            if keyset and ts_end is None:
+                ts_end = self._snapshot_timestamp()
+
+            total = self._request_total(self.TRANSACTION_PATH, self.TRANSACTION_PARAMS, ts_start, ts_end)
+
+            if verbose:
+                print("Total count of transcations to receive: " + str(total))
+
+            from_entry = TronTransaction.from_entry
+
+            def parse(page):
+                start = time.perf_counter()
+                transactions = [from_entry(d, keep_data) for d in page]
+                get_instrumentation().on_parse('transactions', len(transactions), time.perf_counter() - start)
+                return transactions
+
+            if processes is None:
+                transactions = self._iter_entries(self.TRANSACTION_PATH, self.TRANSACTION_PARAMS, total, ts_start,
+                                                  ts_end, verbose, workers, parse, keyset=keyset)
+            else:
+                from_values = TronTransaction._from_values
+                chunks = self._iter_parsed(self.TRANSACTION_PATH, self.TRANSACTION_PARAMS, total, ts_start, ts_end,
+                                           verbose, workers, processes, parse_workers,
+                                           functools.partial(_parse_transaction_pages, ts_start=ts_start,
+                                                             ts_end=ts_end, keep_data=keep_data), 'transactions')
+                transactions = (from_values(v) for chunk in chunks for v in chunk)
+
+            count = 0
+
+            for transaction in transactions:
+                count += 1
+                yield transaction
+        finally:
+            if processes is not None:
+                processes.shutdown(wait=True, cancel_futures=True)
+
+        if verbose:
+            print('\n' + str(count) + ' transcations received.')
@@ -0,0 +1,253 @@
+import json
+import sqlite3
+import threading
+
+from .tronparser import TronTransaction, TronTransfer
+from .tronscanner import TronScan
+
+
+class TronStore(object):
+    """Local SQLite store of transfers and transactions.
+
+    The store is synchronized incrementally with the tronscan api. Queries and exports can run against the
+    store, so the api is only requested for the newest data. Every thread uses its own connection, the database
+    runs in write-ahead log mode, so reads do not block the writes of other threads.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS transfers (
+            wallet TEXT NOT NULL,
+            id TEXT NOT NULL,
+            block INTEGER,
+            transaction_hash TEXT,
+            timestamp INTEGER NOT NULL,
+            from_address TEXT,
+            to_address TEXT,
+            amount TEXT,
+            token_name TEXT,
+            confirmed INTEGER,
+            data TEXT,
+            PRIMARY KEY (wallet, id)
+        );
+        CREATE INDEX IF NOT EXISTS transfers_timestamp ON transfers (wallet, timestamp);
+        CREATE INDEX IF NOT EXISTS transfers_token ON transfers (wallet, token_name, timestamp);
+
+        CREATE TABLE IF NOT EXISTS transactions (
+            wallet TEXT NOT NULL,
+            hash TEXT NOT NULL,
+            block INTEGER,
+            timestamp INTEGER NOT NULL,
+            contract_type INTEGER,
+            confirmed INTEGER,
+            raw TEXT NOT NULL,
+            PRIMARY KEY (wallet, hash)
+        );
+        CREATE INDEX IF NOT EXISTS transactions_timestamp ON transactions (wallet, timestamp);
+    """
+
+    # Count of records which are written in one database transaction
+    BATCH_SIZE = 1000
+
+    # Seconds a connection waits for the write lock of another connection
+    TIMEOUT = 30
+
+    def __init__(self, filename: str):
+        """
+        Arguments:
+            filename {str} -- SQLite database file.
+        """
+        self.filename = filename
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        with self.connection:
+            self.connection.executescript(self.SCHEMA)
+
+    @property
+    def connection(self):
+        """Database connection of the current thread."""
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            # Connections are only used by their thread, close() may run in another one
+            connection = sqlite3.connect(self.filename, timeout=self.TIMEOUT, check_same_thread=False)
+            self._local.connection = connection
+            with self._lock:
+                self._connections.append(connection)
+        return connection
+
+    def close(self):
+        """Closes the database connections of all threads."""
+        with self._lock:
+            for connection in self._connections:
+                connection.close()
+            self._connections = []
+            self._local = threading.local()
+
+    def _write(self, sql: str, rows):
+        """Writes rows in batches and returns the count of rows."""
+        connection = self.connection
+        count = 0
+        batch = []
+
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= self.BATCH_SIZE:
+                with connection:
+                    connection.executemany(sql, batch)
+                count += len(batch)
+                batch = []
+
+        if batch:
+            with connection:
+                connection.executemany(sql, batch)
+            count += len(batch)
+
+        return count
+
+    def add_transfers(self, wallet_address: str, transfers: [TronTransfer]):
+        """Adds or replaces transfers of a wallet. Amounts are stored as text, they can exceed 64 bits.
+
+        Arguments:
+            wallet_address {str} -- Address of wallet.
+            transfers {[TronTransfer]} -- Transfers.
+
+        Returns:
+            int -- Count of written transfers.
+        """
+        rows = ((wallet_address, t.id, t.block, t.transaction_hash, t.timestamp, t.from_address, t.to_address,
+                 None if t.amount is None else str(t.amount), t.token_name, int(bool(t.confirmed)), t.data)
+                for t in transfers)
+
+        return self._write('INSERT OR REPLACE INTO transfers VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', rows)
+
+    def add_transactions(self, wallet_address: str, transaction_dicts):
+        """Adds or replaces transactions of a wallet.
+
+        Arguments:
+            wallet_address {str} -- Address of wallet.
+            transaction_dicts {[dict]} -- Transactions as returned by the api.
+
+        Returns:
+            int -- Count of written transactions.
+        """
+        rows = ((wallet_address, d['hash'], int(d['block']), int(d['timestamp']), d['contractType'],
+                 int(bool(d['confirmed'])), json.dumps(d)) for d in transaction_dicts)
+
+        return self._write('INSERT OR REPLACE INTO transactions VALUES (?, ?, ?, ?, ?, ?, ?)', rows)
+
+    def _sync_start(self, table: str, wallet_address: str):
+        """Timestamp from which a table has to be synchronized.
+
+        Records of the newest timestamp are requested again, because further records with the same timestamp
+        could have been added after the last synchronization. Unconfirmed records are requested again until
+        they are confirmed.
+        """
+        row = self.connection.execute(
+            'SELECT MAX(timestamp), MIN(CASE WHEN confirmed = 0 THEN timestamp END) FROM ' + table +
+            ' WHERE wallet = ?', (wallet_address,)).fetchone()
+
+        if row[0] is None:
+            return None
+        if row[1] is None:
+            return row[0]
+        return min(row[0], row[1])
+
+    def sync(self, wallet_address: str, transactions=False, workers: int = 1, verbose=True, scanner=None):
+        """Fetches the records of a wallet which are newer than the newest stored record.
+
+        Arguments:
+            wallet_address {str} -- Address of wallet.
+
+        Keyword Arguments:
+            transactions {bool} -- Synchronizes the transactions as well. (default: {False})
+            workers {int} -- Count of pages which are fetched in parallel. (default: {1})
+            verbose {bool} -- Prints process status. (default: {True})
+            scanner {TronScan} -- Scanner of the wallet. None for a scanner with the class transport and cache.
+                                  (default: {None})
+
+        Returns:
+            int -- Count of fetched records.
+        """
+        scanner = TronScan(wallet_address) if scanner is None else scanner
+
+        ts_start = self._sync_start('transfers', wallet_address)
+        count = self.add_transfers(wallet_address, scanner.iter_transfers(ts_start=ts_start, verbose=verbose,
+                                                                          workers=workers, keep_data=True))
+
+        if transactions:
+            ts_start = self._sync_start('transactions', wallet_address)
+            total = scanner._request_total(TronScan.TRANSACTION_PATH, TronScan.TRANSACTION_PARAMS, ts_start)
+            count += self.add_transactions(wallet_address, scanner._iter_entries(
+                TronScan.TRANSACTION_PATH, TronScan.TRANSACTION_PARAMS, total, ts_start, None, verbose, workers))
+
+        if verbose:
+            print('\n' + str(count) + ' records synchronized.')
+
+        return count
+
+    @staticmethod
+    def _where(wallet_address: str, tokens: [str], ts_start: int, ts_end: int):
+        """Builds the where clause of a query."""
+        clause = ' WHERE wallet = ?'
+        args = [wallet_address]
+
+        if tokens:
+            tokens = list(set(tokens))
+            clause += ' AND token_name IN (' + ', '.join('?' * len(tokens)) + ')'
+            args.extend(tokens)
+
+        if ts_start is not None:
+            clause += ' AND timestamp >= ?'
+            args.append(ts_start)
+
+        if ts_end is not None:
+            clause += ' AND timestamp <= ?'
+            args.append(ts_end)
+
+        return clause, args
+
+    def get_transfers(self, wallet_address: str, tokens: [str] = None, ts_start: int = None, ts_end: int = None):
+        """Iterates over the stored transfers of a wallet, newest first like the api.
+
+        Arguments:
+            wallet_address {str} -- Address of wallet.
+
+        Keyword Arguments:
+            tokens {[str]} -- List of tokens. None for all tokens. (default: {None})
+            ts_start {int} -- Start timestamp of date range. (default: {None})
+            ts_end {int} -- End timestamp of date range.  (default: {None})
+
+        Yields:
+            TronTransfer -- Transfer.
+        """
+        clause, args = self._where(wallet_address, tokens, ts_start, ts_end)
+        cursor = self.connection.execute(
+            'SELECT id, block, transaction_hash, timestamp, from_address, to_address, amount, token_name, '
+            'confirmed, data FROM transfers' + clause + ' ORDER BY timestamp DESC, block DESC, id', args)
+
+        for row in cursor:
+            yield TronTransfer({'id': row[0], 'block': row[1], 'transactionHash': row[2], 'timestamp': row[3],
+                                'transferFromAddress': row[4], 'transferToAddress': row[5], 'amount': row[6],
+                                'tokenName': row[7], 'confirmed': bool(row[8]), 'data': row[9]})
+
+    def get_transactions(self, wallet_address: str, ts_start: int = None, ts_end: int = None):
+        """Iterates over the stored transactions of a wallet, newest first like the api.
+
+        Arguments:
+            wallet_address {str} -- Address of wallet.
+
+        Keyword Arguments:
+            ts_start {int} -- Start timestamp of date range. (default: {None})
+            ts_end {int} -- End timestamp of date range.  (default: {None})
+
+        Yields:
+            TronTransaction -- Transaction.
+        """
+        clause, args = self._where(wallet_address, None, ts_start, ts_end)
+        cursor = self.connection.execute(
+            'SELECT raw FROM transactions' + clause + ' ORDER BY timestamp DESC, block DESC, hash', args)
+
+        for row in cursor:
+            yield TronTransaction(json.loads(row[0]))
@@ -0,0 +1,118 @@
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .tronscanner import TronScan
+
+
+class TokenInfoCache(object):
+    """Cache of token informations in front of TronScan.get_token_info.
+
+    Fetched informations are only written to the cache file by save(), so a batch of misses costs one write and a
+    save without new informations costs none.
+    """
+
+    def __init__(self, ttl: float = 86400, filename: str = None, fetch=None):
+        """
+        Keyword Arguments:
+            ttl {float} -- Time in seconds until a token information is fetched again. (default: {86400})
+            filename {str} -- Json file which keeps the cache between runs. None for a memory cache. (default: {None})
+            fetch {callable} -- Function which fetches the information of a token id. (default: {TronScan.get_token_info})
+        """
+        self.ttl = ttl
+        self.filename = filename
+        self._fetch = fetch if fetch is not None else TronScan.get_token_info
+        self._entries = {}
+        self._dirty = False
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+
+        if filename is not None and os.path.exists(filename):
+            self.load()
+
+    def _is_fresh(self, entry):
+        return entry is not None and time.time() - entry['time'] < self.ttl
+
+    def load(self):
+        """Loads the cache entries from the cache file."""
+        with open(self.filename, 'r', encoding='utf-8') as f:
+            entries = json.load(f)
+
+        with self._lock:
+            self._entries.update(entries)
+
+    def save(self):
+        """Writes the cache entries to the cache file, if informations were fetched since the last save."""
+        if self.filename is None:
+            return
+
+        # Exports of several threads save the same cache
+        with self._save_lock:
+            with self._lock:
+                if not self._dirty:
+                    return
+                entries = dict(self._entries)
+                self._dirty = False
+
+            tmp_filename = self.filename + '.tmp'
+            try:
+                with open(tmp_filename, 'w', encoding='utf-8') as f:
+                    json.dump(entries, f)
+                os.replace(tmp_filename, self.filename)
+            except BaseException:
+                with self._lock:
+                    self._dirty = True
+                raise
+
+    def _store(self, token_id: str, info):
+        with self._lock:
+            self._entries[token_id] = {'time': time.time(), 'info': info}
+            self._dirty = True
+
+    def get(self, token_id: str):
+        """Returns the information of a token. Missing or expired tokens are fetched.
+
+        Arguments:
+            token_id {str} -- Id of token.
+
+        Returns:
+            json -- Token informations.
+        """
+        entry = self._entries.get(token_id)
+        if self._is_fresh(entry):
+            return entry['info']
+
+        info = self._fetch(token_id)
+        self._store(token_id, info)
+
+        return info
+
+    def get_precision(self, token_id: str):
+        """Returns the precision of a token.
+
+        Arguments:
+            token_id {str} -- Id of token.
+
+        Returns:
+            int -- Count of decimal places.
+        """
+        return self.get(token_id)['data'][0]['precision']
+
+    def prefetch(self, token_ids, workers: int = 8):
+        """Fetches the informations of all missing or expired tokens in parallel.
+
+        Arguments:
+            token_ids {[str]} -- Ids of tokens.
+
+        Keyword Arguments:
+            workers {int} -- Count of parallel requests. (default: {8})
+        """
+        missing = [t for t in set(token_ids) if not self._is_fresh(self._entries.get(t))]
+        if not missing:
+            return
+
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(missing)))) as executor:
+            for token_id, info in zip(missing, executor.map(self._fetch, missing)):
+                self._store(token_id, info)
@@ -0,0 +1,155 @@
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class TronScanError(Exception):
+    """Error of a request to the tronscan api."""
+
+
+class RateLimiter(object):
+    """Token bucket rate limiter. One instance can be shared by several threads and scanners."""
+
+    def __init__(self, rate: float, capacity: int = None):
+        """
+        Arguments:
+            rate {float} -- Count of requests per second.
+
+        Keyword Arguments:
+            capacity {int} -- Maximum count of requests in a burst. None for one second of requests. (default: {None})
+        """
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1, int(rate))
+        self._tokens = float(self.capacity)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: int = 1):
+        """Blocks until the requested count of tokens is available and takes them.
+
+        Keyword Arguments:
+            tokens {int} -- Count of tokens. (default: {1})
+        """
+        while True:
+            wait = self.try_acquire(tokens)
+            if wait <= 0:
+                return
+
+            time.sleep(wait)
+
+    def try_acquire(self, tokens: int = 1):
+        """Takes the requested count of tokens if they are available, without blocking.
+
+        Keyword Arguments:
+            tokens {int} -- Count of tokens. (default: {1})
+
+        Returns:
+            float -- 0 if the tokens were taken, otherwise the time in seconds until they are available.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return 0
+
+            return (tokens - self._tokens) / self.rate
+
+
+class TronTransport(object):
+    """HTTP transport with a pooled session, retries with exponential backoff and rate limiting."""
+
+    RETRY_STATUS = {429, 500, 502, 503, 504}
+
+    def __init__(self, rate_limiter: RateLimiter = None, retries: int = 5, backoff: float = 0.5,
+                 max_backoff: float = 30, timeout: float = 3, pool_size: int = 32):
+        """
+        Keyword Arguments:
+            rate_limiter {RateLimiter} -- Rate limiter for all requests. None for no limit. (default: {None})
+            retries {int} -- Count of retries of a failed request. (default: {5})
+            backoff {float} -- Base delay of the exponential backoff in seconds. (default: {0.5})
+            max_backoff {float} -- Maximum delay between two retries in seconds. (default: {30})
+            timeout {float} -- Timeout of a request in seconds. (default: {3})
+            pool_size {int} -- Count of kept alive connections. (default: {32})
+        """
+        self.rate_limiter = rate_limiter
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def _backoff_delay(self, attempt: int):
+        """Exponential backoff with full jitter."""
+        return random.uniform(0, min(self.max_backoff, self.backoff * (2 ** attempt)))
+
+    def _retry_after(self, response):
+        """Reads the delay of the Retry-After header in seconds or None."""
+        value = response.headers.get('Retry-After')
+        if value is None:
+            return None
+
+        try:
+            return min(self.max_backoff, max(0.0, float(value)))
+        except ValueError:
+            pass
+
+        try:
+            retry_date = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+
+        return min(self.max_backoff, max(0.0, retry_date.timestamp() - time.time()))
+
+    def get(self, url: str, params: str = None):
+        """Sends a GET request and retries it on timeouts, connection errors and temporary failures.
+
+        Arguments:
+            url {str} -- Url of the request.
+
+        Keyword Arguments:
+            params {str} -- Request parameters. (default: {None})
+
+        Raises:
+            TronScanError: The request failed with all retries.
+
+        Returns:
+            requests.Response -- Successful response.
+        """
+        error = None
+
+        for attempt in range(0, self.retries + 1):
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+
+            try:
+                response = self.session.get(url, params=params, timeout=self.timeout)
+            except (requests.exceptions.Timeout, requests.exceptions.ConnectionError) as e:
+                error = "Request " + url + " failed: " + str(e)
+                delay = self._backoff_delay(attempt)
+            else:
+                if response.status_code == 200:
+                    return response
+
+                error = "Request " + url + " failed with status " + str(response.status_code)
+                if response.status_code not in self.RETRY_STATUS:
+                    raise TronScanError(error)
+
+                delay = self._retry_after(response)
+                if delay is None:
+                    delay = self._backoff_delay(attempt)
+
+            if attempt < self.retries:
+                time.sleep(delay)
+
+        raise TronScanError(error + " (" + str(self.retries) + " retries)")
@@ -0,0 +1,213 @@
+import heapq
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .tronexporter import TronTransferExporter
+from .tronscanner import TronScan
+from .tronwriter import ExportWriter
+
+
+class WatchedWallet(object):
+    """Polling state of a watched wallet."""
+
+    def __init__(self, wallet_address: str, since: int, interval: float, callback=None, filename: str = None,
+                 exporter: TronTransferExporter = None, export_format='cointracking', exchange: str = None):
+        self.wallet_address = wallet_address
+        self.callback = callback
+        self.filename = filename
+        self.exporter = exporter
+        self.export_format = export_format
+        self.exchange = exchange
+        self.interval = interval
+        self.scanner = TronScan(wallet_address)
+
+        # Transfers at or after the cursor are requested, the ids of the handled ones are kept with their timestamp
+        self.cursor = since
+        self.seen = {}
+
+        self.polls = 0
+        self.count = 0
+        self.error = None
+
+
+class TronWatcher(object):
+    """Watches wallets for new transfers.
+
+    Every wallet is polled for transfers from the timestamp of its newest handled transfer on. Idle wallets cost
+    one request per poll. The poll interval of a wallet drops to the minimum when new transfers arrive and grows
+    with every idle poll up to the maximum. New confirmed transfers are passed to a callback and appended to an
+    export file. Unconfirmed transfers are held back until they are confirmed.
+    """
+
+    def __init__(self, min_interval: float = 10, max_interval: float = 600, backoff: float = 2.0,
+                 workers: int = 4):
+        """
+        Keyword Arguments:
+            min_interval {float} -- Poll interval of active wallets in seconds. (default: {10})
+            max_interval {float} -- Poll interval of idle wallets in seconds. (default: {600})
+            backoff {float} -- Factor of the poll interval after a poll without new transfers. (default: {2.0})
+            workers {int} -- Count of wallets which are polled in parallel. (default: {4})
+        """
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.workers = workers
+        self.wallets = {}
+        self._stop = threading.Event()
+        # Finished polls of run() as (address, interval), None wakes run() up on stop()
+        self._finished = queue.Queue()
+
+    def add_wallet(self, wallet_address: str, callback=None, filename: str = None,
+                   exporter: TronTransferExporter = None, export_format='cointracking', exchange: str = None,
+                   since: int = None):
+        """Adds a wallet to watch.
+
+        Arguments:
+            wallet_address {str} -- Address of wallet.
+
+        Keyword Arguments:
+            callback {callable} -- Called with the wallet address and the new transfers, oldest first.
+                                   (default: {None})
+            filename {str} -- Export file to which the new transfers are appended. (default: {None})
+            exporter {TronTransferExporter} -- Assignments, currency filters and aliases of the export. Group
+                                               filters are not applied. (default: {TronTransferExporter})
+            export_format {str} -- Name of format, ExportFormat class or instance. (default: {'cointracking'})
+            exchange {str} -- Name of the exchange column. (default: {None})
+            since {int} -- Timestamp of the first watched transfers. None for the current time. (default: {None})
+
+        Returns:
+            WatchedWallet -- State of the wallet.
+        """
+        if exporter is None:
+            exporter = TronTransferExporter(wallet_address)
+        if since is None:
+            since = int(time.time() * 1000)
+
+        wallet = WatchedWallet(wallet_address, since, self.min_interval, callback, filename, exporter,
+                               export_format, exchange)
+        self.wallets[wallet_address] = wallet
+        return wallet
+
+    def poll(self, wallet_address: str):
+        """Requests and handles the new transfers of a wallet.
+
+        Arguments:
+            wallet_address {str} -- Address of wallet.
+
+        Returns:
+            [TronTransfer] -- New transfers, oldest first.
+        """
+        wallet = self.wallets[wallet_address]
+        wallet.polls += 1
+
+        # Idle wallets are recognized by the total count of transfers since the cursor
+        total = wallet.scanner._request_total(TronScan.TRANSFER_PATH, TronScan.TRANSFER_PARAMS, wallet.cursor)
+        if total <= len(wallet.seen):
+            return []
+
+        transfers = [t for t in wallet.scanner.iter_transfers(ts_start=wallet.cursor) if t.id not in wallet.seen]
+        transfers.reverse()
+
+        unconfirmed = [t.timestamp for t in transfers if not t.confirmed]
+        confirmed = [t for t in transfers if t.confirmed]
+        for t in confirmed:
+            wallet.seen[t.id] = t.timestamp
+
+        # The cursor stays at the oldest unconfirmed transfer, which is requested again until it is confirmed
+        if unconfirmed:
+            cursor = min(unconfirmed)
+        else:
+            cursor = max(wallet.seen.values(), default=wallet.cursor)
+        if cursor > wallet.cursor:
+            wallet.cursor = cursor
+            wallet.seen = {tid: ts for tid, ts in wallet.seen.items() if ts >= cursor}
+
+        currencies = set(wallet.exporter.currency_filters)
+        new = [t for t in confirmed if not currencies or t.token_name in currencies]
+        if new:
+            self._emit(wallet, new)
+
+        return new
+
+    def _emit(self, wallet: WatchedWallet, transfers):
+        """Passes new transfers to the callback and appends them to the export file."""
+        wallet.count += len(transfers)
+
+        if wallet.filename is not None:
+            wallet.exporter.token_cache.prefetch(set(t.token_name for t in transfers if t.token_name != '_'))
+            with ExportWriter(wallet.filename, wallet.export_format, append=True) as writer:
+                writer.write_all(wallet.exporter._iter_rows(transfers, wallet.exchange))
+            wallet.exporter.token_cache.save()
+
+        if wallet.callback is not None:
+            wallet.callback(wallet.wallet_address, transfers)
+
+    def _poll_scheduled(self, wallet_address: str):
+        """Polls a wallet and adapts its poll interval to the activity."""
+        wallet = self.wallets[wallet_address]
+
+        try:
+            new = self.poll(wallet_address)
+            wallet.error = None
+        except Exception as e:
+            # A failing request, callback or export only backs off this wallet, the others are polled further
+            print("Poll of wallet " + wallet_address + " failed: " + str(e))
+            wallet.error = e
+            new = None
+
+        if new:
+            wallet.interval = self.min_interval
+        else:
+            wallet.interval = min(self.max_interval, wallet.interval * self.backoff)
+
+        return wallet.interval
+
+    def run(self, duration: float = None):
+        """Polls the wallets until stop() is called or the duration is over.
+
+        Keyword Arguments:
+            duration {float} -- Time in seconds. None to run until stop() is called. (default: {None})
+        """
+        self._stop.clear()
+        self._finished = queue.Queue()
+        end = None if duration is None else time.monotonic() + duration
+
+        now = time.monotonic()
+        schedule = [(now, address) for address in self.wallets]
+        heapq.heapify(schedule)
+        running = 0
+
+        def poll(address):
+            self._finished.put((address, self._poll_scheduled(address)))
+
+        with ThreadPoolExecutor(max_workers=max(1, self.workers)) as executor:
+            while (schedule or running) and not self._stop.is_set():
+                now = time.monotonic()
+                if end is not None and now >= end:
+                    break
+
+                # Every wallet is polled on its own, a slow poll only delays its own wallet
+                while schedule and schedule[0][0] <= now:
+                    executor.submit(poll, heapq.heappop(schedule)[1])
+                    running += 1
+
+                delay = schedule[0][0] - now if schedule else None
+                if end is not None:
+                    delay = end - now if delay is None else min(delay, end - now)
+
+                try:
+                    finished = self._finished.get(timeout=delay)
+                except queue.Empty:
+                    continue
+
+                if finished is not None:
+                    address, interval = finished
+                    running -= 1
+                    heapq.heappush(schedule, (time.monotonic() + interval, address))
+
+    def stop(self):
+        """Stops run() after the running polls."""
+        self._stop.set()
+        self._finished.put(None)
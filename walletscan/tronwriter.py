@@ -0,0 +1,244 @@
+import csv
+import io
+import json
+import os
+import threading
+
+
+class ExportRow(object):
+    """Transfer with the values which are written to an export."""
+
+    __slots__ = ('transfer', 'transfer_type', 'amount', 'currency', 'incoming', 'exchange', 'date')
+
+    def __init__(self, transfer, transfer_type, amount: float, currency: str, incoming: bool, exchange: str,
+                 date: str):
+        self.transfer = transfer
+        self.transfer_type = transfer_type
+        self.amount = amount
+        self.currency = currency
+        self.incoming = incoming
+        self.exchange = exchange
+        self.date = date
+
+
+class ExportFormat(object):
+    """Output format of an export. A format renders chunks of export rows to text."""
+
+    NAME = None
+    DESCRIPTION = None
+
+    def header(self):
+        """Text at the beginning of a new file or None."""
+        return None
+
+    def render(self, rows: [ExportRow]):
+        """Renders a chunk of rows.
+
+        Arguments:
+            rows {[ExportRow]} -- Rows.
+
+        Returns:
+            str -- Text of the rows.
+        """
+        raise NotImplementedError()
+
+
+class CsvExportFormat(ExportFormat):
+    """Base of csv formats. All fields are quoted and quotes in values are escaped."""
+
+    COLUMNS = []
+
+    def _render_csv(self, rows):
+        buffer = io.StringIO()
+        csv.writer(buffer, quoting=csv.QUOTE_ALL, lineterminator='\n').writerows(rows)
+        return buffer.getvalue()
+
+    def header(self):
+        return self._render_csv([self.COLUMNS])
+
+    def fields(self, row: ExportRow):
+        """Values of the columns of a row."""
+        raise NotImplementedError()
+
+    def render(self, rows: [ExportRow]):
+        return self._render_csv(self.fields(r) for r in rows)
+
+
+class CoinTrackingCsvFormat(CsvExportFormat):
+    """Csv file for the import into CoinTracking.info."""
+
+    NAME = 'cointracking'
+    DESCRIPTION = 'CSV for CoinTracking.info'
+
+    # ToDo: Switchable language
+    COLUMNS = ['Typ', 'Kauf', 'Cur.', 'Verkauf', 'Cur.', 'Gebühr', 'Cur.', 'Börse', 'Gruppe', 'Kommentar', 'Datum']
+
+    def fields(self, row: ExportRow):
+        if row.incoming:
+            buy, buy_cur, sell, sell_cur = str(row.amount), row.currency, '', ''
+        else:
+            buy, buy_cur, sell, sell_cur = '', '', str(row.amount), row.currency
+
+        # ToDo: Fee
+        return (row.transfer_type.value, buy, buy_cur, sell, sell_cur, '', '', row.exchange, '',
+                row.transfer.comment, row.date)
+
+
+class WideCsvFormat(CsvExportFormat):
+    """Csv file with all fields of the transfers."""
+
+    NAME = 'csv'
+    DESCRIPTION = 'CSV'
+
+    COLUMNS = ['id', 'block', 'transaction_hash', 'timestamp', 'date', 'from_address', 'to_address', 'token_name',
+               'raw_amount', 'amount', 'currency', 'type', 'direction', 'confirmed', 'exchange', 'comment']
+
+    def fields(self, row: ExportRow):
+        t = row.transfer
+        return (t.id, t.block, t.transaction_hash, t.timestamp, row.date, t.from_address, t.to_address,
+                t.token_name, t.amount, row.amount, row.currency, row.transfer_type.name,
+                'in' if row.incoming else 'out', t.confirmed, row.exchange, t.comment)
+
+
+class JsonLinesFormat(ExportFormat):
+    """One json object with all fields of a transfer per line."""
+
+    NAME = 'jsonl'
+    DESCRIPTION = 'JSON Lines'
+
+    def render(self, rows: [ExportRow]):
+        keys = WideCsvFormat.COLUMNS
+        fields = WideCsvFormat().fields
+        return ''.join(json.dumps(dict(zip(keys, fields(r))), ensure_ascii=False) + '\n' for r in rows)
+
+
+EXPORT_FORMATS = {f.NAME: f for f in (CoinTrackingCsvFormat, WideCsvFormat, JsonLinesFormat)}
+
+
+def get_export_format(export_format):
+    """Returns an ExportFormat instance of a format name, class or instance.
+
+    Arguments:
+        export_format {str} -- Name of format, ExportFormat class or instance.
+
+    Returns:
+        ExportFormat -- Format.
+    """
+    if isinstance(export_format, str):
+        if export_format not in EXPORT_FORMATS:
+            raise ValueError("Unknown export format " + export_format + ". Available: " +
+                             ', '.join(EXPORT_FORMATS))
+        return EXPORT_FORMATS[export_format]()
+
+    if isinstance(export_format, type):
+        return export_format()
+
+    return export_format
+
+
+class ExportWriter(object):
+    """Writes export rows to a file in large buffered chunks.
+
+    A new export is written to a temporary file next to the destination, which replaces the destination when the
+    writer is closed. If the writer is left with an exception, the temporary file is removed and a previous export
+    stays intact.
+    """
+
+    def __init__(self, filename: str, export_format='cointracking', append=False, chunk_size: int = 10000,
+                 buffer_size: int = 1 << 20):
+        """
+        Arguments:
+            filename {str} -- Destination file.
+
+        Keyword Arguments:
+            export_format {str} -- Name of format, ExportFormat class or instance. (default: {'cointracking'})
+            append {bool} -- Appends to an existing file, the header is only written to new files. (default: {False})
+            chunk_size {int} -- Count of rows which are rendered and written at once. (default: {10000})
+            buffer_size {int} -- Size of the file buffer in bytes. (default: {1 << 20})
+        """
+        self.filename = filename
+        self.export_format = get_export_format(export_format)
+        self.append = append
+        self.chunk_size = chunk_size
+        self.buffer_size = buffer_size
+        self.count = 0
+        self._chunk = []
+        self._file = None
+        self._tmp_filename = None
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def open(self):
+        """Opens the file and writes the header to new files."""
+        is_new = not (self.append and os.path.exists(self.filename) and os.path.getsize(self.filename) > 0)
+
+        if self.append:
+            self._file = open(self.filename, 'a', encoding='utf-8', newline='', buffering=self.buffer_size)
+        else:
+            self._tmp_filename = self.filename + '.' + str(os.getpid()) + '.' + str(threading.get_ident()) + '.tmp'
+            self._file = open(self._tmp_filename, 'w', encoding='utf-8', newline='', buffering=self.buffer_size)
+
+        header = self.export_format.header()
+        if is_new and header:
+            self._file.write(header)
+
+    def write(self, row: ExportRow):
+        """Writes a row.
+
+        Arguments:
+            row {ExportRow} -- Row.
+        """
+        self._chunk.append(row)
+        if len(self._chunk) >= self.chunk_size:
+            self.flush()
+
+    def write_all(self, rows):
+        """Writes all rows of an iterable.
+
+        Arguments:
+            rows {[ExportRow]} -- Rows.
+
+        Returns:
+            int -- Count of written rows.
+        """
+        for row in rows:
+            self.write(row)
+        return self.count + len(self._chunk)
+
+    def flush(self):
+        """Renders and writes the pending rows."""
+        if self._chunk:
+            self._file.write(self.export_format.render(self._chunk))
+            self.count += len(self._chunk)
+            self._chunk = []
+        self._file.flush()
+
+    def close(self):
+        """Writes the pending rows and closes the file. A new export replaces the destination."""
+        if self._file is not None:
+            self.flush()
+            self._file.close()
+            self._file = None
+
+            if self._tmp_filename is not None:
+                os.replace(self._tmp_filename, self.filename)
+                self._tmp_filename = None
+
+    def abort(self):
+        """Closes the file without the pending rows. A new export is removed, the destination is kept."""
+        if self._file is not None:
+            self._chunk = []
+            self._file.close()
+            self._file = None
+
+            if self._tmp_filename is not None:
+                os.remove(self._tmp_filename)
+                self._tmp_filename = None